@@ -0,0 +1,83 @@
+# Description: daily AWS observation tables parsed once per source file and
+#   cached as typed tables indexed by (station, timestamp)
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+aws_dir = Path(os.getenv("AWS_DIR"))
+cache_dir = Path(
+    os.getenv("AWS_CACHE_DIR", Path.home() / ".cache" / "validation" / "aws_obs")
+)
+
+aws_cols = ["name", "timestamp", "rr", "temp", "rh", "hi"]
+
+_days = {}
+
+
+def aws_file(day):
+    return aws_dir / f"stn_obs_24hr_{day}_08PHT.csv"
+
+
+def cache_file(day):
+    return cache_dir / f"stn_obs_24hr_{day}_08PHT.pkl"
+
+
+def _ingest(in_file, out_file):
+    df = pd.read_csv(in_file, usecols=aws_cols, na_values="-999.000000")
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df = df.set_index(["name", "timestamp"], drop=False).sort_index()
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_file = out_file.with_suffix(f".{os.getpid()}.tmp")
+    df.to_pickle(tmp_file)
+    os.replace(tmp_file, out_file)
+    return df
+
+
+def read_day(day):
+    """AWS observations of day indexed by (name, timestamp), None if there is
+    no CSV for day.
+
+    The CSV is parsed once; the typed table is reused until the CSV changes.
+    """
+    in_file, out_file = aws_file(day), cache_file(day)
+    if not in_file.is_file():
+        return None
+    src_mtime = in_file.stat().st_mtime_ns
+    key = (day, src_mtime)
+
+    if key not in _days:
+        if out_file.is_file() and out_file.stat().st_mtime_ns >= src_mtime:
+            _days[key] = pd.read_pickle(out_file)
+        else:
+            _days[key] = _ingest(in_file, out_file)
+
+    return _days[key]
+
+
+def station_obs(day, names):
+    """Observations of one station name (or a list of names) on day, with the
+    aws_cols columns. None if there is no CSV for day."""
+    df = read_day(day)
+    if df is None:
+        return None
+    names = [names] if isinstance(names, str) else list(names)
+    # lookups on the sorted station level of the index, no row mask
+    names = [name for name in names if name in df.index.levels[0]]
+    rows = df.loc[names] if names else df.iloc[:0]
+    return rows.reset_index(drop=True)
+
+
+def read_days(days, names=None):
+    """Observations of several days (and optionally only some stations) as one
+    table indexed by (name, timestamp)."""
+    dfs = [read_day(day) for day in days]
+    dfs = [df for df in dfs if df is not None]
+    if not dfs:
+        return pd.DataFrame(columns=aws_cols)
+    df = pd.concat(dfs).sort_index()
+    if names is not None:
+        df = df.loc[df.index.get_level_values("name").isin(names)]
+    return df
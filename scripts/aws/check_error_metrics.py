@@ -0,0 +1,82 @@
+# Title: Check of the accumulated error metrics
+# Description: Compares error_metrics against the per-station, per-day loop
+#   it replaced (pandas means and scipy pearsonr) on random station data with
+#   missing hours, short days and days where the forecast or the observation
+#   is constant (no rain), which must be left out of r2mean.
+
+import sys
+import warnings
+
+import numpy as np
+from scipy.stats import pearsonr
+
+from error_metrics import HOURS, error_metrics
+
+VARIABLES = ["rain", "temp"]
+
+
+def random_data(stations, days, rng):
+    shape = (stations, days, HOURS, len(VARIABLES))
+    fcst = rng.gamma(0.5, 4, size=shape)
+    obs = rng.gamma(0.5, 4, size=shape)
+    obs[rng.random(shape) < 0.2] = np.nan
+    # constant series (dry observations, steady temperature, dry forecast)
+    # and a day with too few samples
+    obs[0, 1, :, 0] = 0
+    obs[1, 2, :, 1] = 26.7
+    fcst[2, 0, :, 0] = 0
+    obs[3, 3, 10:, :] = np.nan
+    return fcst, obs
+
+
+def legacy_metrics(fcst, obs, min_samples=25):
+    rows = []
+    for stn_fcst, stn_obs in zip(fcst, obs):
+        row = []
+        for ivar in range(len(VARIABLES)):
+            x, y = stn_fcst[..., ivar], stn_obs[..., ivar]
+            valid = np.isfinite(x) & np.isfinite(y)
+            diff = x[valid] - y[valid]
+            r2 = []
+            for day_x, day_y, day_valid in zip(x, y, valid):
+                if day_valid.sum() < min_samples:
+                    continue
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    r, _ = pearsonr(day_x[day_valid], day_y[day_valid])
+                if np.isfinite(r):
+                    r2.append(r**2)
+            row.append(
+                [
+                    diff.mean(),
+                    np.abs(diff).mean(),
+                    np.sqrt((diff**2).mean()),
+                    np.mean(r2) if r2 else np.nan,
+                ]
+            )
+        rows.append(row)
+    return np.array(rows)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    stations, days = 5, 6
+    fcst, obs = random_data(stations, days, rng)
+
+    df = error_metrics(fcst, obs, VARIABLES, [f"stn{i}" for i in range(stations)])
+    engine = np.stack(
+        [
+            df[[f"{var}_{metric}" for metric in ("me", "mae", "rmse", "r2mean")]]
+            for var in VARIABLES
+        ],
+        axis=1,
+    )
+
+    if not np.allclose(engine, legacy_metrics(fcst, obs), rtol=1e-9, equal_nan=True):
+        print("Error metrics differ!")
+        sys.exit(1)
+    print(f"{stations} stations x {days} days: error metrics match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# Description: daily accumulators of the 5-day WRF forecast errors against
+#   AWS and GSMaP at every station, one file per day, so the error metrics of
+#   any period are computed without rereading the raw inputs
+
+import os
+import sys
+import getopt
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from get_5day_gsmap_aws_wrf import (
+    get_5day_gsmap_aws_wrf,
+    read_stations,
+    stn_file,
+    wrf_json_file,
+)
+from aws_obs import aws_file
+from gsmap_station_series import gsmap_file
+from error_metrics import STATS, accumulate, hourly_array, metrics_table
+
+accum_dir = Path(
+    os.getenv(
+        "ERROR_ACCUM_DIR", Path.home() / ".cache" / "validation" / "error_accumulators"
+    )
+)
+
+variables = ["rain", "temp", "rh", "hi"]
+# observations the forecast is compared with, and their compared variables
+references = {"aws": variables, "gsmap": ["rain"]}
+
+
+def accum_file(day):
+    return accum_dir / f"error_accum_{day}.nc"
+
+
+def source_files(day):
+    """Raw inputs of the accumulators of day that exist: the WRF forecast of 5
+    days before and the AWS and GSMaP files of the days since."""
+    past_days = [day - timedelta(int(lag)) for lag in range(5, 0, -1)]
+    files = [wrf_json_file(past_days[0])]
+    files += [aws_file(past_day) for past_day in past_days]
+    files += [gsmap_file(past_day) for past_day in past_days]
+    return [in_file for in_file in files if in_file.is_file()]
+
+
+def fill_day(day):
+    """Fold the 5-day forecast errors of every station for day (the WRF run of
+    5 days before against the observations since) into accumulators and store
+    them. Returns the (reference, station, variable, stat) accumulators."""
+    station_list = read_stations(stn_file)
+    sources = source_files(day)
+    acc = np.zeros((len(references), len(station_list), len(variables), len(STATS)))
+
+    for istn, (_, stn) in enumerate(station_list.iterrows()):
+        df_wrf, df_aws, df_gsmap, _ = get_5day_gsmap_aws_wrf(day, stn)
+
+        # rename aws and gsmap columns to match wrf
+        df_aws = df_aws.rename(columns={"rr": "rain"})
+        df_gsmap = df_gsmap.rename(columns={"precip": "rain"})
+
+        wrf = hourly_array(df_wrf, variables)
+        # variables without reference values get zero counts
+        acc[0, istn] = accumulate(wrf, hourly_array(df_aws, variables))
+        acc[1, istn] = accumulate(wrf, hourly_array(df_gsmap, variables))
+
+    da = xr.DataArray(
+        acc,
+        dims=("reference", "station", "variable", "stat"),
+        coords={
+            "reference": list(references),
+            "station": station_list["name"].values,
+            "variable": variables,
+            "stat": STATS,
+        },
+        name="accumulators",
+        # late inputs show up as a different list of sources
+        attrs={"day": str(day), "sources": " ".join(f.name for f in sources)},
+    )
+
+    accum_dir.mkdir(parents=True, exist_ok=True)
+    out_file = accum_file(day)
+    tmp_file = out_file.with_suffix(f".{os.getpid()}.nc")
+    da.to_netcdf(tmp_file)
+    os.replace(tmp_file, out_file)
+    return da
+
+
+def load_day(day):
+    """Accumulators of day, filled from the raw inputs only when the day is not
+    stored yet, lacks a station of the station list, or an input arrived or
+    changed after the day was stored (late AWS or GSMaP data)."""
+    names = read_stations(stn_file)["name"].values
+    out_file = accum_file(day)
+    if out_file.is_file():
+        with xr.open_dataarray(out_file) as da:
+            da = da.load()
+        sources = source_files(day)
+        out_mtime = out_file.stat().st_mtime_ns
+        if (
+            set(names).issubset(da["station"].values)
+            and da.attrs.get("sources") == " ".join(f.name for f in sources)
+            and all(f.stat().st_mtime_ns <= out_mtime for f in sources)
+        ):
+            return da.sel(station=names)
+    return fill_day(day).sel(station=names)
+
+
+def period_metrics(days):
+    """Error metrics of each station over days from the stored accumulators,
+    as {reference: table with a row per station}."""
+    names = read_stations(stn_file)["name"].values
+    acc = xr.concat([load_day(day) for day in days], dim="day")
+
+    tables = {}
+    for ref, ref_vars in references.items():
+        ref_acc = acc.sel(reference=ref, variable=ref_vars)
+        ref_acc = ref_acc.transpose("station", "day", "variable", "stat")
+        tables[ref] = metrics_table(ref_acc.values, ref_vars, names)
+    return tables
+
+
+if __name__ == "__main__":
+    days = []
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hd:", ["date="])
+    except getopt.GetoptError:
+        print("error_accumulators.py -d <YYYY-MM-DD> ...")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == "-h":
+            print("error_accumulators.py -d <YYYY-MM-DD> ...")
+            print("  store the error accumulators of the 5-day forecasts of each date")
+            sys.exit()
+        elif opt in ("-d", "--date"):
+            days.append(pd.to_datetime(arg).date())
+
+    for day in days:
+        fill_day(day)
+        print(f"Saved {accum_file(day)}")
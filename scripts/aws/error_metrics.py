@@ -0,0 +1,112 @@
+# Description: vectorized error metrics of station forecasts against
+#   observations given as aligned (station, day, hour, variable) arrays
+
+import numpy as np
+import pandas as pd
+
+METRICS = ["me", "mae", "rmse", "r2mean"]
+
+# hours of a 5-day forecast
+HOURS = 120
+
+
+def hourly_array(df, variables, hours=HOURS):
+    """(hour, variable) float array of the first hours rows of df, NaN where
+    df is shorter or lacks a variable."""
+    out = np.full((hours, len(variables)), np.nan)
+    values = df.reindex(columns=variables).to_numpy(dtype=float)[:hours]
+    out[: len(values)] = values
+    return out
+
+
+def _nanmean(a, axis):
+    # NaN (without a warning) where a slice has no valid value
+    valid = np.isfinite(a)
+    count = valid.sum(axis=axis)
+    total = np.where(valid, a, 0).sum(axis=axis)
+    return np.divide(total, count, out=np.full(count.shape, np.nan), where=count > 0)
+
+
+# sums over the hours where both forecast and observation are valid
+STATS = [
+    "n",
+    "sum",
+    "sum_abs",
+    "sum_sq",
+    "sum_x",
+    "sum_y",
+    "sum_xy",
+    "sum_xx",
+    "sum_yy",
+]
+
+
+def accumulate(fcst, obs):
+    """Sums (STATS on the last axis) of fcst - obs and the cross-products
+    needed for R^2, reduced over the hour axis of (..., hour, variable) arrays.
+
+    Sums add up, so the accumulators of any set of days give the metrics of
+    that set without the hourly data (see metrics_table).
+    """
+    valid = np.isfinite(fcst) & np.isfinite(obs)
+    x = np.where(valid, fcst, 0)
+    y = np.where(valid, obs, 0)
+    diff = x - y
+    sums = [valid, diff, np.abs(diff), diff**2, x, y, x * y, x**2, y**2]
+    return np.stack([s.sum(axis=-2) for s in sums], axis=-1).astype(float)
+
+
+def r2_daily(acc, min_samples=25):
+    """Pearson R^2 from (..., STATS) accumulators of single days, NaN with
+    fewer than min_samples valid pairs or a constant series (like pearsonr)."""
+    n, sx, sy, sxy, sxx, syy = (
+        acc[..., STATS.index(stat)]
+        for stat in ("n", "sum_x", "sum_y", "sum_xy", "sum_xx", "sum_yy")
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx**2 / n
+        var_y = syy - sy**2 / n
+        r = cov / np.sqrt(var_x * var_y)
+    # the raw sums leave rounding residue instead of 0 for constant series
+    constant = (var_x <= 1e-12 * sxx) | (var_y <= 1e-12 * syy)
+    return np.where((n >= min_samples) & ~constant, r**2, np.nan)
+
+
+def metrics_table(acc, variables, names, min_samples=25):
+    """ME, MAE and RMSE pooled over all days and hours of each station, and the
+    mean over days of the daily R^2 (see r2_daily).
+
+    acc holds the (station, day, variable, STATS) accumulators of single
+    days. Returns a table with a row per station and <variable>_<metric>
+    columns.
+    """
+    total = acc.sum(axis=1)
+    n = total[..., STATS.index("n")]
+
+    def _mean(stat):
+        return np.divide(
+            total[..., STATS.index(stat)], n, out=np.full(n.shape, np.nan), where=n > 0
+        )
+
+    metrics = {
+        "me": _mean("sum"),
+        "mae": _mean("sum_abs"),
+        "rmse": np.sqrt(_mean("sum_sq")),
+        "r2mean": _nanmean(r2_daily(acc, min_samples), axis=1),
+    }
+
+    df = pd.DataFrame(
+        {
+            f"{var}_{metric}": metrics[metric][:, ivar]
+            for metric in METRICS
+            for ivar, var in enumerate(variables)
+        },
+        index=pd.Index(names, name="name"),
+    )
+    return df
+
+
+def error_metrics(fcst, obs, variables, names, min_samples=25):
+    """metrics_table of (station, day, hour, variable) fcst and obs arrays."""
+    return metrics_table(accumulate(fcst, obs), variables, names, min_samples)
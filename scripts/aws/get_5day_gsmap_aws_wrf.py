@@ -7,14 +7,18 @@ from pathlib import Path
 from datetime import timedelta
 import pandas as pd
 import numpy as np
-import salem
 
+from gsmap_station_series import read_stations, station_series, stn_file  # noqa: F401
+from aws_obs import station_obs
+from wrf_forecast_json import read_forecast
 
-gsmap_dir = Path(os.getenv("GSMAP_NC_DIR"))
-aws_dir = Path(os.getenv("AWS_DIR"))
 wrf_json_dir = Path(os.getenv("WRF_JSON_DIR"))
 
 
+def wrf_json_file(day):
+    return wrf_json_dir / f"forecast_lufft_stations_{day}_08PHT.json"
+
+
 def get_5day_gsmap_aws_wrf(dt, stn):
     # Intialize dataframe for each station
     df_gsmap = pd.DataFrame(
@@ -31,23 +35,15 @@ def get_5day_gsmap_aws_wrf(dt, stn):
         # Set date variable
         dt_var = dt - timedelta(int(day))
 
-        # Access gsmap file and data
-        gsmap_fn = gsmap_dir / f"gsmap_gauge_{dt_var}_00.nc"
-        if gsmap_fn.is_file():
-            gsmap_df = salem.open_xr_dataset(gsmap_fn)
-            df_temp_gsmap = gsmap_df.sel(
-                lon=stn["lon"], lat=stn["lat"], method="nearest"
-            ).to_dataframe()
-            df_temp_gsmap = df_temp_gsmap["precip"].reset_index(level="time")
-
+        # Access gsmap data from the station series store
+        df_temp_gsmap = station_series(dt_var, stn["name"])
+        if df_temp_gsmap is not None:
             # Append daily data
             df_gsmap = pd.concat([df_gsmap, df_temp_gsmap])
 
-        aws_fn = aws_dir / f"stn_obs_24hr_{dt_var}_08PHT.csv"
-        if aws_fn.is_file():
-            aws_df = pd.read_csv(aws_fn, usecols=aws_cols, na_values="-999.000000")
-            aws_df = aws_df[aws_df["name"] == stn["name"]]
-
+        # Access aws data of the station from the cached daily table
+        aws_df = station_obs(dt_var, stn["name"])
+        if aws_df is not None:
             # Append daily data
             df_aws = pd.concat([df_aws, aws_df])
 
@@ -65,26 +61,13 @@ def get_5day_gsmap_aws_wrf(dt, stn):
     date_str_gsmap = str(dt_gsmap)
 
     # Access wrf fcst from 5 days ago
-    wrf_fn = wrf_json_dir / f"forecast_lufft_stations_{dt_var_str}_08PHT.json"
+    wrf_fn = wrf_json_file(dt_var_str)
     if wrf_fn.is_file():
-        df_wrf = pd.read_json(wrf_fn, orient="index")
-
-        # Initialize wrf data table
-        wrf_vars = {"timestamp": []}
-        
-        keys = df_wrf["forecast"][stn["name"]]["hr"][0].keys()
-        for key in keys:
-            wrf_vars[key] = []
-
-        # Get 5-day data from wrf fcst json file
-        for i in np.arange(0, 120, 1):
-            for key in keys:
-                wrf_vars[key].append(df_wrf["forecast"][stn["name"]]["hr"][i][key])
-
-                # Set missing values to NaN
-                wrf_vars[key] = [np.nan if v is None else v for v in wrf_vars[key]]
+        # Get 5-day data from wrf fcst json file (parsed once for all stations)
+        df_wrf = read_forecast(wrf_fn).frame(stn["name"], hours=120)
+    else:
+        df_wrf = pd.DataFrame(columns=["timestamp"])
 
-    df_wrf = pd.DataFrame(wrf_vars)
     df_wrf.insert(loc=0, column="name", value=stn["name"])
 
     # Fill-in missing timesteps
@@ -101,7 +84,7 @@ def get_5day_gsmap_aws_wrf(dt, stn):
             .reset_index()
             .reindex(columns=df_wrf.columns)
         )
-        cols = df_wrf.columns.difference(list(wrf_vars.keys())[1:])
+        cols = ["name", "timestamp"]
         df_wrf[cols] = df_wrf[cols].ffill()
         df_wrf["timestamp"] = dates
 
@@ -0,0 +1,107 @@
+# Description: hourly GSMaP precipitation at the stations, one table per day
+#   (time x station) extracted once from each GSMaP file
+
+import os
+import sys
+import getopt
+from pathlib import Path
+
+import pandas as pd
+import salem
+
+sys.path.append(f"{os.getenv('MAINDIR')}/validation/scripts/helpers")
+from station_index import read_stations, station_index  # noqa: E402
+
+gsmap_dir = Path(os.getenv("GSMAP_NC_DIR"))
+series_dir = Path(
+    os.getenv(
+        "GSMAP_STATION_DIR", Path.home() / ".cache" / "validation" / "gsmap_stations"
+    )
+)
+stn_file = Path(__file__).parent / "stations_lufft.csv"
+
+_days = {}
+
+
+def gsmap_file(day):
+    return gsmap_dir / f"gsmap_gauge_{day}_00.nc"
+
+
+def series_file(day):
+    return series_dir / f"gsmap_stations_{day}.pkl"
+
+
+def fill_day(day):
+    """Extract the hourly precipitation of every station from the GSMaP file of
+    day and store it. Returns the time x station table, None if there is no
+    GSMaP file."""
+    in_file = gsmap_file(day)
+    if not in_file.is_file():
+        return None
+
+    ds = salem.open_xr_dataset(in_file)
+    points = station_index(ds, stn_file).nearest(ds[["precip"]])
+    df = points["precip"].transpose("time", "station").to_pandas()
+
+    series_dir.mkdir(parents=True, exist_ok=True)
+    out_file = series_file(day)
+    tmp_file = out_file.with_suffix(f".{os.getpid()}.tmp")
+    df.to_pickle(tmp_file)
+    os.replace(tmp_file, out_file)
+    return df
+
+
+def load_day(day):
+    """Time x station GSMaP precipitation of day, without opening any netCDF
+    file once the day is stored.
+
+    The store is (re)filled from the GSMaP file when the day is missing, older
+    than the GSMaP file or lacks a station of the station list.
+    """
+    in_file, out_file = gsmap_file(day), series_file(day)
+    src_mtime = in_file.stat().st_mtime_ns if in_file.is_file() else None
+    key = (day, src_mtime)
+
+    if key not in _days:
+        df = None
+        if out_file.is_file() and (
+            src_mtime is None or out_file.stat().st_mtime_ns >= src_mtime
+        ):
+            df = pd.read_pickle(out_file)
+            if not set(read_stations(stn_file)["name"]).issubset(df.columns):
+                df = None
+        if df is None:
+            df = fill_day(day)
+        _days[key] = df
+
+    return _days[key]
+
+
+def station_series(day, name):
+    """GSMaP precipitation of one station and day as time, precip columns."""
+    df = load_day(day)
+    if df is None:
+        return None
+    return df[name].rename("precip").rename_axis("time").reset_index()
+
+
+if __name__ == "__main__":
+    days = []
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hd:", ["date="])
+    except getopt.GetoptError:
+        print("gsmap_station_series.py -d <YYYY-MM-DD> ...")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == "-h":
+            print("gsmap_station_series.py -d <YYYY-MM-DD> ...")
+            print("  store the station series of the GSMaP file of each date")
+            sys.exit()
+        elif opt in ("-d", "--date"):
+            days.append(pd.to_datetime(arg).date())
+
+    for day in days:
+        if fill_day(day) is None:
+            print(f"File {gsmap_file(day)} does not exist")
+        else:
+            print(f"Saved {series_file(day)}")
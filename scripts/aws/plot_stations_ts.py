@@ -3,8 +3,10 @@
 # Last edit: May 19, 2023
 
 import sys
+import time
 import getopt
 import pytz
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timedelta
 from pathlib import Path
 
@@ -14,7 +16,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.legend import Legend
 
-from get_5day_gsmap_aws_wrf import get_5day_gsmap_aws_wrf
+from get_5day_gsmap_aws_wrf import (
+    get_5day_gsmap_aws_wrf,
+    read_stations,
+    stn_file,
+)
 
 
 tz = pytz.timezone("Asia/Manila")
@@ -285,7 +291,62 @@ def plot_comparison(dt, ax, var, label, data_aws, data_wrf, ymin, data_gsmap=Non
         plt.setp(leg.get_title(), fontsize="16")
 
 
-def proc(out_dir):
+def plot_station(dt, stn, df_wrf, df_aws, df_gsmap, dt_var_str, out_file):
+    """Draw and save the 5-day comparison figure of one station. Returns the
+    rendering time in seconds."""
+    start = time.perf_counter()
+
+    # Plotting for each station
+    plt.rcParams["figure.figsize"] = (20, 24)
+
+    fig, (ax1, ax2, ax3, ax4) = plt.subplots(ncols=1, nrows=4)
+
+    plot_comparison(
+        dt,
+        ax1,
+        "rain",
+        "Rainfall (mm/hr)",
+        df_aws["rr"],
+        df_wrf,
+        0,
+        df_gsmap["precip"],
+    )
+    plot_comparison(
+        dt,
+        ax2,
+        "temp",
+        "Temperature (C\N{DEGREE SIGN})",
+        df_aws["temp"],
+        df_wrf,
+        15,
+    )
+    plot_comparison(dt, ax3, "rh", "Relative Humidity (%)", df_aws["rh"], df_wrf, 10)
+    plot_comparison(
+        dt,
+        ax4,
+        "hi",
+        "Heat Index (C\N{DEGREE SIGN})",
+        df_aws["hi"],
+        df_wrf,
+        15,
+    )
+
+    ax1.set_title(
+        f"Forecast ({stn['name']})\nInitialized at {dt_var_str} 08:00 PHT",
+        pad=28,
+        fontsize=28,
+    )
+
+    ax4.set_xlabel("Day and Time (PHT)", size=24)
+
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    fig.tight_layout(pad=2.0)
+    fig.savefig(str(out_file), dpi=300)
+    plt.close(fig)
+    return time.perf_counter() - start
+
+
+def proc(out_dir, workers=1):
     yyyymmdd = out_dir.parent.name
     zz = out_dir.name
 
@@ -296,79 +357,55 @@ def proc(out_dir):
 
     dt = init_dt.date()
 
-    station_list = pd.read_csv("stations_lufft.csv")
+    station_list = read_stations(stn_file)
+    # Jobs, figure files and the AWS, GSMaP and WRF lookups all go by name
+    _duplicates = station_list["name"][station_list["name"].duplicated()]
+    if len(_duplicates):
+        raise ValueError(
+            f"Duplicate station names in {stn_file}: {sorted(set(_duplicates))}"
+        )
 
-    # Loop through stations
+    # Load the data of all stations first
+    jobs = {}
     for i, stn in station_list.iterrows():
         df_wrf, df_aws, df_gsmap, dt_var_str = get_5day_gsmap_aws_wrf(dt, stn)
 
-        # Plotting for each station
-        plt.figure(dpi=300)
-        plt.rcParams["figure.figsize"] = (20, 24)
-
-        fig, (ax1, ax2, ax3, ax4) = plt.subplots(ncols=1, nrows=4)
-
-        plot_comparison(
-            dt,
-            ax1,
-            "rain",
-            "Rainfall (mm/hr)",
-            df_aws["rr"],
-            df_wrf,
-            0,
-            df_gsmap["precip"],
-        )
-        plot_comparison(
-            dt,
-            ax2,
-            "temp",
-            "Temperature (C\N{DEGREE SIGN})",
-            df_aws["temp"],
-            df_wrf,
-            15,
-        )
-        plot_comparison(
-            dt, ax3, "rh", "Relative Humidity (%)", df_aws["rh"], df_wrf, 10
-        )
-        plot_comparison(
-            dt,
-            ax4,
-            "hi",
-            "Heat Index (C\N{DEGREE SIGN})",
-            df_aws["hi"],
-            df_wrf,
-            15,
-        )
-
-        ax1.set_title(
-            f"Forecast ({stn['name']})\nInitialized at {dt_var_str} 08:00 PHT",
-            pad=28,
-            fontsize=28,
-        )
-
-        ax4.set_xlabel("Day and Time (PHT)", size=24)
-
         label = stn["name"].replace(" ", "_")
         out_file = (
             Path(out_dir) / f"validation_aws_combined_{label}_{init_dt_str}PHT.png"
         )
-        out_file.parent.mkdir(parents=True, exist_ok=True)
-        fig.tight_layout(pad=2.0)
-        plt.savefig(str(out_file), dpi=300)
-        print("Saved figure " + str(out_file))
+        jobs[stn["name"]] = (dt, stn, df_wrf, df_aws, df_gsmap, dt_var_str, out_file)
+
+    # Render the figures, in worker processes if asked to
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                name: pool.submit(plot_station, *job) for name, job in jobs.items()
+            }
+            timings = {name: future.result() for name, future in futures.items()}
+    else:
+        timings = {name: plot_station(*job) for name, job in jobs.items()}
+
+    for name, elapsed in timings.items():
+        print(f"Saved figure {jobs[name][-1]} ({elapsed:.1f} s)")
+
 
 if __name__ == "__main__":
     out_dir = Path("")
+    workers = 1
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "ho:", ["odir="])
+        opts, args = getopt.getopt(sys.argv[1:], "ho:w:", ["odir=", "workers="])
     except getopt.GetoptError:
-        print("plot_station_ts.py -o <output dir>")
+        print("plot_station_ts.py -o <output dir> [-w <workers>]")
         sys.exit(2)
     for opt, arg in opts:
         if opt == "-h":
-            print("plot_station_ts.py -o <output dir>")
+            print("plot_station_ts.py -o <output dir> [-w <workers>]")
+            print("  -w  number of processes rendering the station figures (default 1)")
             sys.exit()
         elif opt in ("-o", "--odir"):
             out_dir = Path(arg)
             out_dir.mkdir(parents=True, exist_ok=True)
-    proc(out_dir)
+        elif opt in ("-w", "--workers"):
+            workers = int(arg)
+    proc(out_dir, workers)
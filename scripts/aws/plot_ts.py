@@ -7,6 +7,8 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+from wrf_forecast_json import read_forecast
+
 tz = pytz.timezone("Asia/Manila")
 
 stn = os.getenv("STATION_ID")
@@ -28,12 +30,10 @@ def proc(in_dir, out_dir):
     hh_str = init_dt.strftime("%H")
 
     print(f"Reading forecast data at {init_dt_str}PHT...")
-    df = pd.read_json(fcst_dir / f"forecast_{init_dt_str}PHT.json", orient="index")
+    fcst = read_forecast(fcst_dir / f"forecast_{init_dt_str}PHT.json")
 
     # get data from json
-    PR_wrf = []
-    for i in np.arange(0, 25, 1):
-        PR_wrf.append(df["forecast"][f"{city_stn}"]["hr"][i]["rain"])
+    PR_wrf = fcst.series(city_stn, "rain", hours=25)
     # --------------------------#
     # Read GSMaP and GFS Data
     # --------------------------#
@@ -9,12 +9,11 @@ from datetime import timedelta
 from pathlib import Path
 
 import numpy as np
-from scipy.stats import pearsonr
 import pandas as pd
 
 import matplotlib.pyplot as plt
 
-from get_5day_gsmap_aws_wrf import get_5day_gsmap_aws_wrf
+from error_accumulators import period_metrics
 
 
 tz = pytz.timezone("Asia/Manila")
@@ -33,195 +32,17 @@ def proc(out_dir):
     if init_dt.day == 5:
         print("Getting month average scalar accuracy measures")
 
-        station_list = pd.read_csv("stations_lufft.csv")
-
         first = init_dt.replace(day=2).date()
         last_month = first - timedelta(days=2)
         first_of_last_month = last_month.replace(day=3)
         day_count = (first - first_of_last_month).days + 1
 
-        # Set aws cols for extraction
-        aws_cols = ["name", "timestamp", "rr", "temp", "rh", "hi"]
-
-        # Compute R^2
-        def R2(df1_wrf, df2_other):
-            if (len(df1_wrf) > 0) and (len(df2_other) > 0):
-                dict_out = {}
-                cols = df2_other.drop(
-                    columns=["name", "timestamp", "time"], errors="ignore"
-                ).columns
-
-                for var in cols:
-                    x = df1_wrf[df1_wrf[var].notnull() & df2_other[var].notnull()][var]
-                    y = df2_other[df1_wrf[var].notnull() & df2_other[var].notnull()][
-                        var
-                    ]
-
-                    # have at least 25 non-nan samples
-                    if (len(x) >= 25) and (len(y >= 25)):
-                        r2, _ = pearsonr(x, y)
-                        dict_out[var] = [r2**2]
-
-                return pd.DataFrame(dict_out)
-
-        # Initialize metrics data table for all stations
-        metrics_cols = [
-            "name",
-            "rain_me",
-            "temp_me",
-            "rh_me",
-            "hi_me",
-            "rain_mae",
-            "temp_mae",
-            "rh_mae",
-            "hi_mae",
-            "rain_rmse",
-            "temp_rmse",
-            "rh_rmse",
-            "hi_rmse",
-            "rain_r2mean",
-            "temp_r2mean",
-            "rh_r2mean",
-            "hi_r2mean",
-        ]
-        df_wrf_aws_metrics_allstns = pd.DataFrame(columns=metrics_cols)
-        metrics_cols = ["name", "rain_me", "rain_mae", "rain_rmse", "rain_r2mean"]
-        df_wrf_gsmap_metrics_allstns = pd.DataFrame(columns=metrics_cols)
-
-        # Loop through stations
-        for _, stn in station_list.iterrows():
-
-            # Intialize wrf, aws, and gsmap data
-            df_wrf_aws_diff = pd.DataFrame({"rain": [], "temp": [], "rh": [], "hi": []})
-            df_wrf_aws_r2 = pd.DataFrame({"rain": [], "temp": [], "rh": [], "hi": []})
-            df_wrf_gsmap_diff = pd.DataFrame({"rain": []})
-            df_wrf_gsmap_r2 = pd.DataFrame({"rain": []})
-
-            # Loop through days in month
-            for single_date in (
-                first_of_last_month + timedelta(n) for n in range(day_count)
-            ):
-
-                print(single_date.strftime("%Y%m%d"))
-                df_wrf, df_aws, df_gsmap, _ = get_5day_gsmap_aws_wrf(single_date, stn)
-
-                df_wrf = pd.DataFrame(df_wrf)
-
-                # rename aws column to match wrf
-                df_aws.rename(columns={"rr": "rain"}, inplace=True)
-                df_gsmap.rename(columns={"precip": "rain"}, inplace=True)
-
-                # Compute difference
-                compare_cols = ["rain", "temp", "rh", "hi"]
-                df_wrf_aws_diff_temp = df_wrf[compare_cols] - df_aws[compare_cols]
-                compare_cols = ["rain"]
-                df_wrf_gsmap_diff_temp = df_wrf[compare_cols] - df_gsmap[compare_cols]
-
-                # Compute R2 for each 5-day forecast
-                df_r2_wrf_aws = R2(df_wrf, df_aws)
-                df_r2_wrf_gsmap = R2(df_wrf, df_gsmap)
-
-                df_wrf_aws_diff = pd.concat([df_wrf_aws_diff, df_wrf_aws_diff_temp])
-                df_wrf_gsmap_diff = pd.concat(
-                    [df_wrf_gsmap_diff, df_wrf_gsmap_diff_temp]
-                )
-                df_wrf_aws_r2 = pd.concat([df_wrf_aws_r2, df_r2_wrf_aws])
-                df_wrf_gsmap_r2 = pd.concat([df_wrf_gsmap_r2, df_r2_wrf_gsmap])
-
-            rename_cols_wrf_aws = {
-                "rain": "rain_me",
-                "temp": "temp_me",
-                "rh": "rh_me",
-                "hi": "hi_me",
-            }
-            rename_cols_wrf_gsmap = {"rain": "rain_me"}
-
-            # Mean Error
-            df_wrf_aws_metrics = df_wrf_aws_diff.mean()
-            df_wrf_gsmap_metrics = df_wrf_gsmap_diff.mean()
-            rename_cols = {
-                "rain": "rain_me",
-                "temp": "temp_me",
-                "rh": "rh_me",
-                "hi": "hi_me",
-            }
-            df_wrf_aws_metrics.rename(index=rename_cols, inplace=True)
-            rename_cols = {"rain": "rain_me"}
-            df_wrf_gsmap_metrics.rename(index=rename_cols_wrf_gsmap, inplace=True)
-
-            # Mean Absolute Error
-            df_wrf_aws_metrics_temp = df_wrf_aws_diff.abs().mean()
-            df_wrf_gsmap_metrics_temp = df_wrf_gsmap_diff.abs().mean()
-            df_wrf_aws_metrics = pd.concat(
-                [df_wrf_aws_metrics, df_wrf_aws_metrics_temp]
-            )
-            df_wrf_gsmap_metrics = pd.concat(
-                [df_wrf_gsmap_metrics, df_wrf_gsmap_metrics_temp]
-            )
-            rename_cols = {
-                "rain": "rain_mae",
-                "temp": "temp_mae",
-                "rh": "rh_mae",
-                "hi": "hi_mae",
-            }
-            df_wrf_aws_metrics.rename(index=rename_cols, inplace=True)
-            rename_cols = {"rain": "rain_mae"}
-            df_wrf_gsmap_metrics.rename(index=rename_cols, inplace=True)
-
-            # Root Mean Square Error
-            df_wrf_aws_metrics_temp = (df_wrf_aws_diff**2).mean() ** (1 / 2)
-            df_wrf_gsmap_metrics_temp = (df_wrf_gsmap_diff**2).mean() ** (1 / 2)
-            df_wrf_aws_metrics = pd.concat(
-                [df_wrf_aws_metrics, df_wrf_aws_metrics_temp]
-            )
-            df_wrf_gsmap_metrics = pd.concat(
-                [df_wrf_gsmap_metrics, df_wrf_gsmap_metrics_temp]
-            )
-            rename_cols = {
-                "rain": "rain_rmse",
-                "temp": "temp_rmse",
-                "rh": "rh_rmse",
-                "hi": "hi_rmse",
-            }
-            df_wrf_aws_metrics.rename(index=rename_cols, inplace=True)
-            rename_cols = {"rain": "rain_rmse"}
-            df_wrf_gsmap_metrics.rename(index=rename_cols, inplace=True)
-
-            # R^2
-            df_wrf_aws_metrics_temp = df_wrf_aws_r2.mean()
-            df_wrf_gsmap_metrics_temp = df_wrf_gsmap_r2.mean()
-            df_wrf_aws_metrics = pd.concat(
-                [df_wrf_aws_metrics, df_wrf_aws_metrics_temp]
-            )
-            df_wrf_gsmap_metrics = pd.concat(
-                [df_wrf_gsmap_metrics, df_wrf_gsmap_metrics_temp]
-            )
-            rename_cols = {
-                "rain": "rain_r2mean",
-                "temp": "temp_r2mean",
-                "rh": "rh_r2mean",
-                "hi": "hi_r2mean",
-            }
-            df_wrf_aws_metrics.rename(index=rename_cols, inplace=True)
-            rename_cols = {"rain": "rain_r2mean"}
-            df_wrf_gsmap_metrics.rename(index=rename_cols, inplace=True)
-
-            df_wrf_aws_metrics = df_wrf_aws_metrics.to_frame().T
-            df_wrf_gsmap_metrics = df_wrf_gsmap_metrics.to_frame().T
-
-            # Insert station name column
-            df_wrf_aws_metrics.insert(loc=0, column="name", value=stn["name"])
-            df_wrf_gsmap_metrics.insert(loc=0, column="name", value=stn["name"])
-
-            df_wrf_aws_metrics_allstns = pd.concat(
-                [df_wrf_aws_metrics_allstns, df_wrf_aws_metrics]
-            )
-            df_wrf_gsmap_metrics_allstns = pd.concat(
-                [df_wrf_gsmap_metrics_allstns, df_wrf_gsmap_metrics]
-            )
-
-        df_wrf_aws_metrics_allstns = df_wrf_aws_metrics_allstns.mean()
-        df_wrf_gsmap_metrics_allstns = df_wrf_gsmap_metrics_allstns.mean()
+        # Metrics of each station from the daily accumulators (days not stored
+        # yet are filled from the raw inputs), then the mean across all stations
+        days = [first_of_last_month + timedelta(n) for n in range(day_count)]
+        tables = period_metrics(days)
+        df_wrf_aws_metrics_allstns = tables["aws"].mean()
+        df_wrf_gsmap_metrics_allstns = tables["gsmap"].mean()
 
         x = df_wrf_aws_metrics_allstns.round(2)
         y = df_wrf_gsmap_metrics_allstns.round(2)
@@ -0,0 +1,66 @@
+# Description: reader for the WRF station forecast json files
+#   ({station: {"forecast": {"hr": [{"timestamp": ..., var: ...}, ...]}}}),
+#   parsed once into (station, hour, variable) arrays
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_forecasts = {}
+
+
+class StationForecast:
+    """Hourly forecast of every station of one json file.
+
+    values is a float (station, hour, variable) array with None mapped to NaN
+    (stations with fewer hours, and records without a variable, are padded
+    with NaN), timestamps the matching (station, hour) array of timestamp
+    strings.
+    """
+
+    def __init__(self, data):
+        self.names = list(data)
+        _records = [data[name]["forecast"]["hr"] for name in self.names]
+        # every variable of any record, in order of first appearance
+        _keys = dict.fromkeys(key for recs in _records for rec in recs for key in rec)
+        self.variables = [key for key in _keys if key != "timestamp"]
+        self.hours = max((len(recs) for recs in _records), default=0)
+
+        _shape = (len(self.names), self.hours)
+        self.timestamps = np.full(_shape, np.nan, dtype=object)
+        self.values = np.full(_shape + (len(self.variables),), np.nan)
+        for i, recs in enumerate(_records):
+            if not recs:
+                continue
+            self.timestamps[i, : len(recs)] = [rec.get("timestamp") for rec in recs]
+            self.values[i, : len(recs)] = np.array(
+                [[rec.get(var) for var in self.variables] for rec in recs],
+                dtype=float,
+            )
+        self.timestamps[pd.isnull(self.timestamps)] = np.nan
+        self._pos = {name: pos for pos, name in enumerate(self.names)}
+
+    def series(self, name, var, hours=None):
+        """Forecast of one variable at one station as a float array."""
+        return self.values[self._pos[name], :hours, self.variables.index(var)]
+
+    def frame(self, name, hours=None):
+        """Forecast of one station as a table with a timestamp column followed
+        by one column per variable."""
+        _pos = self._pos[name]
+        df = pd.DataFrame(self.values[_pos, :hours], columns=self.variables)
+        df.insert(loc=0, column="timestamp", value=self.timestamps[_pos, :hours])
+        return df
+
+
+def read_forecast(path):
+    """StationForecast of a json file, parsed once per process (and again only
+    when the file changes)."""
+    path = Path(path)
+    key = (str(path), path.stat().st_mtime_ns)
+    if key not in _forecasts:
+        with open(path) as f:
+            _forecasts[key] = StationForecast(json.load(f))
+    return _forecasts[key]
@@ -9,14 +9,18 @@ import getopt
 import pytz
 from pathlib import Path
 import pandas as pd
+import xarray as xr
 import salem
-import xesmf as xe
 from datetime import timedelta
 
-import matplotlib.pyplot as plt
 import seaborn as sns
 
-from helpers.plot import plot_map, XLIM, YLIM
+from helpers.grid_cache import get_regridder
+from helpers.plot import XLIM, YLIM
+from helpers.render_farm import render_maps
+
+sys.path.append(f"{os.getenv('MAINDIR')}/validation/scripts/helpers")
+from wrf_daily import daily_rain  # noqa: E402
 
 # Access environment variables for directories
 wrf_nc_dir = Path(os.getenv("PYWRF_NC_DIR"))
@@ -38,10 +42,36 @@ post_title = " - GSMaP 24-hr Total Rainfall (mm)"
 titles = ["WRF ensemble mean", "WRF run 1", "WRF run 2", "WRF run 3", "GFS"]
 
 
+def diff_var_opts():
+    """Plot format of each difference map, in the order of names."""
+    var_opts = []
+    for i, name in enumerate(names):
+
+        var_opts.append(
+            {
+                "name": name,
+                "title": f"{titles[i]}{post_title}",
+                "units": "mm",
+                "levels": range(-50, 51, 10),
+                "colors": sns.blend_palette(
+                    [
+                        "#8b4513",
+                        "#f0e68c",
+                        "#ffffff",
+                        "#48d1cc",
+                        "#000080",
+                    ],
+                    n_colors=12,
+                ),
+            },
+        )
+    return var_opts
+
+
 def main(in_file, out_dir):
 
-    # Access GSMAP file
-    gsmap = salem.open_xr_dataset(in_file)["precip"]
+    # Access GSMAP file (loaded once for all lead days)
+    gsmap = salem.open_xr_dataset(in_file)["precip"].load()
 
     # Set date to be validated
     init_dt_utc_start = pd.to_datetime(
@@ -50,80 +80,69 @@ def main(in_file, out_dir):
     init_dt_start = init_dt_utc_start.astimezone(tz)
     init_dt_str_start = init_dt_start.strftime("%Y-%m-%d %H")
 
-    # Loop through previous 5 days model initialization
+    # Daily totals of the previous 5 days model initializations, up to the
+    # first missing WRF or GFS file
+    wrf_totals = []
+    gfs_totals = []
     for day in range(5):
 
-        # Set plot format variables
-        var_opts = []
-        for i, name in enumerate(names):
-
-            var_opts.append(
-                {
-                    "name": name,
-                    "title": f"{titles[i]}{post_title}",
-                    "units": "mm",
-                    "levels": range(-50, 51, 10),
-                    "colors": sns.blend_palette(
-                        [
-                            "#8b4513",
-                            "#f0e68c",
-                            "#ffffff",
-                            "#48d1cc",
-                            "#000080",
-                        ],
-                        n_colors=12,
-                    ),
-                },
-            )
-
         # Set adjusted date
         init_dt_utc = init_dt_utc_start - pd.Timedelta(day, "d")
-        init_dt = init_dt_utc.astimezone(tz)
-        init_dt_str = init_dt.strftime("%Y-%m-%d %H")
-        init_dt_str2 = init_dt.strftime("%Y-%m-%d_%H")
 
-        # Open wrf file
+        # Member daily totals (ens, lat, lon) from 08 PHT of the validated day,
+        # read from the daily WRF product
         wrf_nc_file = wrf_nc_dir / f"wrf_{init_dt_utc:%Y-%m-%d_%H}.nc"
-        if not wrf_nc_file.is_file():
+        wrf_rain = daily_rain(wrf_nc_file, init_dt_utc_start.normalize())
+        if wrf_rain is None:
             print(wrf_nc_file)
             print("WRF out file not found")
-            return
-        wrf_ds = salem.open_xr_dataset(wrf_nc_file)
-
-        wrf_rain = wrf_ds["rain"].isel(
-            time=(wrf_ds.time.dt.day == init_dt_utc_start.day)
-        )
+            break
         wrf_rain = wrf_rain.sel(lat=slice(*YLIM), lon=slice(*XLIM))
 
-        # Compute ensemble mean and member daily totals
-        wrf_rain_ens = wrf_rain.mean("ens").sum("time")
-        wrf_rain_run1 = wrf_rain.sel(ens=0).sum("time")
-        wrf_rain_run2 = wrf_rain.sel(ens=1).sum("time")
-        wrf_rain_run3 = wrf_rain.sel(ens=2).sum("time")
-
         # Access GFS file
         gfs_nc_file = gfs_nc_dir / f"gfs_{init_dt_utc:%Y-%m-%d_%H}_day.nc"
         print(gfs_nc_file)
         if not gfs_nc_file.is_file():
             print("GFS file not found")
-            return
+            break
 
-        gfs_rain = salem.open_xr_dataset(gfs_nc_file)["precip"].isel(time=day)
+        wrf_totals.append(wrf_rain)
+        gfs_totals.append(salem.open_xr_dataset(gfs_nc_file)["precip"].isel(time=day))
 
-        # Compute difference
-        wrfout_list = [wrf_rain_ens, wrf_rain_run1, wrf_rain_run2, wrf_rain_run3]
-        diff_das = []
-        for wrfout in wrfout_list:
-            regridder = xe.Regridder(wrfout, gsmap, "bilinear")
-            wrfout_temp = regridder(wrfout)
-            diff_das.append(wrfout_temp - gsmap)
+    if not wrf_totals:
+        return
+
+    # Regrid the whole (lead, ens, lat, lon) stack in one call, the ensemble
+    # mean is taken after regridding
+    wrf_stack = xr.concat(wrf_totals, dim="lead", join="override")
+    regridder = get_regridder(wrf_stack, gsmap, "bilinear")
+    wrf_re = regridder(wrf_stack)
+    wrf_diff = wrf_re - gsmap
+    wrf_ens_diff = wrf_re.mean("ens") - gsmap
 
-        regridder = xe.Regridder(gsmap, gfs_rain, "bilinear")
-        gsmap_re_gfs = regridder(gsmap)
+    gfs_stack = xr.concat(gfs_totals, dim="lead", join="override")
+    regridder = get_regridder(gsmap, gfs_stack, "bilinear")
+    gfs_diff = gfs_stack - regridder(gsmap)
 
-        diff_das.append(gfs_rain - gsmap_re_gfs)
+    # Plot
+    jobs = []
+    for day in range(len(wrf_totals)):
+
+        # Set plot format variables
+        var_opts = diff_var_opts()
+
+        # Set adjusted date
+        init_dt_utc = init_dt_utc_start - pd.Timedelta(day, "d")
+        init_dt = init_dt_utc.astimezone(tz)
+        init_dt_str = init_dt.strftime("%Y-%m-%d %H")
+        init_dt_str2 = init_dt.strftime("%Y-%m-%d_%H")
+
+        # Compute difference
+        diff_das = [wrf_ens_diff.isel(lead=day)]
+        for ens in range(3):
+            diff_das.append(wrf_diff.isel(lead=day).sel(ens=ens))
+        diff_das.append(gfs_diff.isel(lead=day))
 
-        # Plot
         for ida, da in enumerate(diff_das):
             plt_opts = var_opts[ida]
             dt_end = init_dt_start + timedelta(days=1)
@@ -132,14 +151,14 @@ def main(in_file, out_dir):
                 "title"
             ] = f"{plt_opts['title']}\n initialized {init_dt_str} PHT\n valid from {init_dt_str_start} to {dt_end_str} PHT"
             # plt_opts["annotation"] = f"GSMaP (gauge calibrated) at {init_dt_str} PHT."
-            fig = plot_map(da, var_opts[ida])
 
             out_file_pref = var_opts[ida]["name"]
             out_file = (
                 out_dir / f"{out_file_pref}-24hr_rain_day{day+1}_{init_dt_str2}PHT.png"
             )
-            fig.savefig(out_file, bbox_inches="tight", dpi=300)
-            plt.close("all")
+            jobs.append((da, var_opts[ida], out_file))
+
+    render_maps(jobs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,148 @@
+# Title: Benchmark of the single-pass contingency engine
+# Description: Compares the six calculate_cont_* passes (plus the per-category
+#   np.count_nonzero calls) against calculate_contingencies on a random
+#   GSMaP-sized grid and checks that both give the same counts. With -k the
+#   (time, ens) stack kernels of stack_category_counts (numba and numpy
+#   backends) are compared against calling calculate_contingencies per field.
+
+import sys
+import getopt
+import timeit
+
+import numpy as np
+
+from helpers import (
+    CATEGORIES,
+    calculate_contingency,
+    calculate_cont_dry,
+    calculate_cont_low,
+    calculate_cont_moderate,
+    calculate_cont_heavy,
+    calculate_cont_extreme,
+    calculate_contingencies,
+    numba,
+    stack_category_counts,
+)
+
+# GSMaP 0.1 deg global grid (60S-60N)
+GSMAP_SHAPE = (1200, 3600)
+
+funcs = [
+    calculate_contingency,
+    calculate_cont_dry,
+    calculate_cont_low,
+    calculate_cont_moderate,
+    calculate_cont_heavy,
+    calculate_cont_extreme,
+]
+
+
+def random_rain(shape, rng):
+    rain = rng.gamma(0.4, 15, size=shape).astype(np.float32)
+    rain[rng.random(shape) < 0.4] = 0
+    return rain
+
+
+def legacy_counts(fcst, obs):
+    counts = []
+    for func in funcs:
+        cont = func(fcst, obs)
+        counts.append([np.count_nonzero(cont == code) for code in (4, 3, 2, 1)])
+    return np.array(counts)
+
+
+def engine_counts(fcst, obs):
+    return calculate_contingencies(fcst, obs)[-1]
+
+
+def main(shape, number):
+    rng = np.random.default_rng(0)
+    fcst = random_rain(shape, rng)
+    obs = random_rain(shape, rng)
+
+    if not np.array_equal(legacy_counts(fcst, obs), engine_counts(fcst, obs)):
+        print("Contingency counts differ!")
+        sys.exit(1)
+
+    t_legacy = min(
+        timeit.repeat(lambda: legacy_counts(fcst, obs), number=number, repeat=3)
+    )
+    t_engine = min(
+        timeit.repeat(lambda: engine_counts(fcst, obs), number=number, repeat=3)
+    )
+
+    print(f"Grid {shape[0]} x {shape[1]}, {len(CATEGORIES)} categories")
+    print(f"calculate_cont_* passes : {t_legacy / number * 1000:8.1f} ms")
+    print(f"calculate_contingencies : {t_engine / number * 1000:8.1f} ms")
+    print(f"Speedup                 : {t_legacy / t_engine:8.1f}x")
+
+
+def per_field_counts(fcst, obs):
+    return np.array(
+        [
+            [engine_counts(fcst[t, e], obs[t]) for e in range(fcst.shape[1])]
+            for t in range(fcst.shape[0])
+        ]
+    )
+
+
+def main_stack(shape, stack, number):
+    rng = np.random.default_rng(0)
+    fcst = random_rain(stack + shape, rng)
+    obs = random_rain(stack[:1] + shape, rng)
+
+    backends = ["numpy"] if numba is None else ["numpy", "numba"]
+    ref = per_field_counts(fcst, obs)
+    for backend in backends:
+        # the first numba call also compiles the kernel
+        if not np.array_equal(stack_category_counts(fcst, obs, backend), ref):
+            print(f"Contingency counts of the {backend} backend differ!")
+            sys.exit(1)
+
+    print(f"Stack {stack[0]} x {stack[1]} x {shape[0]} x {shape[1]} (time, ens, y, x)")
+    t_ref = min(
+        timeit.repeat(lambda: per_field_counts(fcst, obs), number=number, repeat=3)
+    )
+    print(f"calculate_contingencies per field : {t_ref / number * 1000:8.1f} ms")
+    for backend in backends:
+        t_backend = min(
+            timeit.repeat(
+                lambda: stack_category_counts(fcst, obs, backend),
+                number=number,
+                repeat=3,
+            )
+        )
+        print(
+            f"stack_category_counts ({backend:5s})     : "
+            f"{t_backend / number * 1000:8.1f} ms ({t_ref / t_backend:.1f}x)"
+        )
+    if numba is None:
+        print("numba is not installed, numba backend skipped")
+
+
+if __name__ == "__main__":
+    shape = GSMAP_SHAPE
+    stack = None
+    number = 3
+    usage = "benchmark_contingency.py -s <ny>x<nx> -k <time>x<ens> -n <number of runs>"
+    try:
+        opts, args = getopt.getopt(
+            sys.argv[1:], "hs:k:n:", ["shape=", "stack=", "number="]
+        )
+    except getopt.GetoptError:
+        print(usage)
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == "-h":
+            print(usage)
+            sys.exit()
+        elif opt in ("-s", "--shape"):
+            shape = tuple(int(n) for n in arg.split("x"))
+        elif opt in ("-k", "--stack"):
+            stack = tuple(int(n) for n in arg.split("x"))
+        elif opt in ("-n", "--number"):
+            number = int(arg)
+    if stack is None:
+        main(shape, number)
+    else:
+        main_stack(shape, stack, number)
@@ -8,18 +8,19 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import salem
-import xesmf as xe
 
 from helpers import (
-    calculate_contingency,
-    calculate_cont_dry,
-    calculate_cont_low,
-    calculate_cont_moderate,
-    calculate_cont_heavy,
-    calculate_cont_extreme,
-    cont_table,
+    CATEGORIES,
+    calculate_contingencies,
+    category_codes,
+    cont_table_counts,
+    save_daily_counts,
 )
 
+sys.path.append(f"{os.getenv('MAINDIR')}/validation/scripts/helpers")
+from grid_cache import get_regridder  # noqa: E402
+from wrf_daily import daily_file, daily_rain  # noqa: E402
+
 XLIM = (116, 128)
 YLIM = (5, 20)
 
@@ -47,7 +48,7 @@ def plot_panel(conts, init_dt):
     tab_header_cols = plt.cm.BuPu(np.full(len(tab_headers), 0.1))
     for ir in range(2):
         for ic in range(3):
-            pod, far, sr, cell_text = cont_table(conts[ir][ic]["dat"])
+            pod, far, sr, cell_text = cont_table_counts(conts[ir][ic]["dat"])
             title_text = f"24-hr {conts[ir][ic]['title']} Rainfall\n"
             footer_text = (
                 f"Probability of Detection = {pod}\nFalse Alarm Ratio = {far}\n"
@@ -185,6 +186,29 @@ def plot_panel(conts, init_dt):
     return fig
 
 
+def load_rain(init_dt_utc):
+    """Ensemble mean WRF 24-hr rain regridded to GSMaP and the GSMaP 24-hr rain
+    of one initialization, None if either file is missing."""
+    gsmap_file = gsmap_nc_dir / f"gsmap_gauge_{init_dt_utc:%Y-%m-%d_%H}_day.nc"
+    wrf_nc_file = wrf_nc_dir / f"wrf_{init_dt_utc:%Y-%m-%d_%H}.nc"
+    if not gsmap_file.is_file():
+        print(f"File {gsmap_file} does not exist")
+        return None
+
+    # 24-hr total from 08 PHT (00 UTC) of the initialization day, from the
+    # daily WRF product (written from the hourly file if needed)
+    wrf_rain = daily_rain(wrf_nc_file, init_dt_utc.normalize(), ensmean=True)
+    if wrf_rain is None:
+        print(f"File {wrf_nc_file} ({daily_file(wrf_nc_file).name}) does not exist")
+        return None
+    wrf_rain = wrf_rain.sel(lat=slice(*YLIM), lon=slice(*XLIM))
+
+    gsmap = salem.open_xr_dataset(gsmap_file)["precip"]
+
+    regridder = get_regridder(wrf_rain, gsmap, "bilinear")
+    return regridder(wrf_rain), gsmap
+
+
 def proc(out_dir):
     yyyymmdd = out_dir.parent.name
     zz = out_dir.name
@@ -193,24 +217,19 @@ def proc(out_dir):
     init_dt = init_dt_utc.astimezone(tz)
     init_dt_str = init_dt.strftime("%Y-%m-%d_%H")
 
-    gsmap_file = gsmap_nc_dir / f"gsmap_gauge_{init_dt_utc:%Y-%m-%d_%H}_day.nc"
-    gsmap = salem.open_xr_dataset(gsmap_file)["precip"]
-
-    wrf_nc_file = wrf_nc_dir / f"wrf_{init_dt_utc:%Y-%m-%d_%H}.nc"
-    if not wrf_nc_file.is_file():
-        print("WRF out file not found")
+    rain = load_rain(init_dt_utc)
+    if rain is None:
         return
-    wrf_ds = salem.open_xr_dataset(wrf_nc_file)
+    wrf_rain_re, gsmap = rain
 
-    wrf_rain = wrf_ds["rain"].isel(time=(wrf_ds.time.dt.day == init_dt_utc.day))
-    wrf_rain = wrf_rain.sel(lat=slice(*YLIM), lon=slice(*XLIM))
-    wrf_rain = wrf_rain.mean("ens").sum("time")
+    print("Getting contingency functions for all rainfall categories ...")
+    fcst_cls, obs_cls, joint, counts = calculate_contingencies(wrf_rain_re, gsmap)
 
-    regridder = xe.Regridder(wrf_rain, gsmap, "bilinear")
-    wrf_rain_re = regridder(wrf_rain)
+    # counts of the day for the week and month averages
+    print(f"Saved {save_daily_counts(init_dt_utc, joint, counts)}")
+    counts = dict(zip(CATEGORIES, counts))
 
-    print("Getting contingency function for total rainfall ...")
-    cont = calculate_contingency(wrf_rain_re, gsmap)
+    cont = category_codes(fcst_cls, obs_cls, "total")
     # save contingency table plot as netCDF file
     print("Saving contingency table to netCDF file...")
     da_out = wrf_rain_re.copy()
@@ -223,31 +242,16 @@ def proc(out_dir):
     out_file = out_dir / f"contingency_{init_dt_str}PHT.nc"
     da_out.to_netcdf(out_file)
 
-    print("Getting contingency function for dry rainfall category...")
-    cont_dry = calculate_cont_dry(wrf_rain_re, gsmap)
-
-    print("Getting contingency function for low rainfall category...")
-    cont_low = calculate_cont_low(wrf_rain_re, gsmap)
-
-    print("Getting contingency function for moderate rainfall category...")
-    cont_mod = calculate_cont_moderate(wrf_rain_re, gsmap)
-
-    print("Getting contingency function for heavy rainfall category...")
-    cont_heavy = calculate_cont_heavy(wrf_rain_re, gsmap)
-
-    print("Getting contingency function for extreme rainfall category...")
-    cont_ext = calculate_cont_extreme(wrf_rain_re, gsmap)
-
     conts = [
         [
-            {"dat": cont_dry, "title": "Dry"},
-            {"dat": cont_low, "title": "Low"},
-            {"dat": cont_mod, "title": "Moderate"},
+            {"dat": counts["dry"], "title": "Dry"},
+            {"dat": counts["low"], "title": "Low"},
+            {"dat": counts["mod"], "title": "Moderate"},
         ],
         [
-            {"dat": cont_heavy, "title": "Heavy"},
-            {"dat": cont_ext, "title": "Extreme"},
-            {"dat": cont, "title": "Total"},
+            {"dat": counts["heavy"], "title": "Heavy"},
+            {"dat": counts["ext"], "title": "Extreme"},
+            {"dat": counts["total"], "title": "Total"},
         ],
     ]
     plot_panel(conts, init_dt)
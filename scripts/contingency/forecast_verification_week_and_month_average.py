@@ -14,21 +14,21 @@ import matplotlib.pyplot as plt
 import calendar
 from datetime import timedelta
 from helpers import (
-    calculate_contingency,
-    calculate_cont_dry,
-    calculate_cont_low,
-    calculate_cont_moderate,
-    calculate_cont_heavy,
-    calculate_cont_extreme,
+    CATEGORIES,
+    calculate_contingencies,
+    load_daily_counts,
+    save_daily_counts,
 )
+from forecast_verification import load_rain
 import os.path
 import os
-import salem
-import xesmf as xe
 import pytz
 import sys
 import getopt
 
+sys.path.append(f"{os.getenv('MAINDIR')}/validation/scripts/helpers")
+from skill_scores import skill_scores  # noqa: E402
+
 # initialize dataframe
 
 
@@ -51,38 +51,73 @@ def init_df():
             "pod",
             "far",
             "sr",
-            "pod_ave_offset",
-            "far_sr_ave_offset",
         ],
     )
     return df
 
 
-def weekAverage(date_today, out_dir):
+def average_table(daily_counts):
+    """Average of daily contingency tables given as (day, category, 4) counts.
+
+    Counts are averaged over all days, while pod, far and sr are averaged only
+    over the days where they are defined (non-zero denominator). None if there
+    are no days.
+    """
+    if len(daily_counts) == 0:
+        return None
+    df = init_df().astype(float)
+    counts = np.asarray(daily_counts, dtype=float).reshape(-1, len(CATEGORIES), 4)
+    hit, f_alarm, miss, c_neg = np.moveaxis(counts, -1, 0)
+
+    df["hit"] = hit.mean(axis=0)
+    df["f_alarm"] = f_alarm.mean(axis=0)
+    df["miss"] = miss.mean(axis=0)
+    df["c_neg"] = c_neg.mean(axis=0)
+    df["fcst_yes"] = df["hit"] + df["f_alarm"]
+    df["fcst_no"] = df["miss"] + df["c_neg"]
+    df["obs_yes"] = df["hit"] + df["miss"]
+    df["obs_no"] = df["f_alarm"] + df["c_neg"]
+    df["total_obs"] = df["obs_yes"] + df["obs_no"]
+    df["total_fcst"] = df["fcst_yes"] + df["fcst_no"]
+
+    scores = skill_scores(hit, f_alarm, miss, c_neg)
+    for col, score in (("pod", "POD"), ("far", "FAR"), ("sr", "SR")):
+        valid = np.isfinite(scores[score])
+        df[col] = (
+            np.where(valid, scores[score], 0).sum(axis=0)
+            / np.where(valid.any(axis=0), valid.sum(axis=0), np.nan)
+            * 100
+        )
 
-    df = init_df()
+    return df
 
-    XLIM = (116, 128)
-    YLIM = (5, 20)
 
-    # initialize functions for loop
-    funcs = [
-        calculate_contingency,
-        calculate_cont_dry,
-        calculate_cont_low,
-        calculate_cont_moderate,
-        calculate_cont_heavy,
-        calculate_cont_extreme,
-    ]
+def daily_counts(days):
+    """(hit, f_alarm, miss, c_neg) of every category, one entry per day of days
+    with data.
 
-    print("Computing week average contingency tables ...")
+    Counts are the artifacts saved by forecast_verification.py, computed from
+    the gridded data (and saved) only when a day has no artifact yet.
+    """
+    counts_list = []
+    for day in days:
+        counts = load_daily_counts(day)
+        if counts is None:
+            print(f"No contingency counts for {day:%Y-%m-%d_%H}, computing")
+            rain = load_rain(day)
+            if rain is None:
+                continue
+            _, _, joint, counts = calculate_contingencies(*rain)
+            save_daily_counts(day, joint, counts)
+
+        counts_list.append(counts)
 
-    # days counter to account for missing data
-    c = 0
+    return counts_list
 
-    # for logging categories of values that need offsetting
-    offset_pod = []
-    offset_far_sr = []
+
+def weekAverage(date_today, out_dir):
+
+    print("Computing week average contingency tables ...")
 
     # Set dates
 
@@ -90,115 +125,12 @@ def weekAverage(date_today, out_dir):
     zz = out_dir.name
 
     print(yyyymmdd_orig)
-    # init_dt_utc = pd.to_datetime(f"{date_today}", format="%Y%m%d_%H", utc=True)
     init_dt_utc = date_today
-    # init_dt_str = init_dt.strftime("%Y-%m-%d_%H")
-
-    # Loop through last 7 days
-    for i in range(0, 7):
-        yyyymmdd = init_dt_utc - timedelta(days=i)
-
-        # open netCDF files and extract variables
-
-        wrf_nc_file = Path(os.getenv("PYWRF_NC_DIR")) / f"wrf_{yyyymmdd:%Y-%m-%d_%H}.nc"
-
-        gsmap_file = (
-            Path(os.getenv("GSMAP_NC_DIR"))
-            / f"gsmap_gauge_{yyyymmdd:%Y-%m-%d_%H}_day.nc"
-        )
-
-        print(wrf_nc_file)
-
-        # Check if file exists
-        if not (Path(wrf_nc_file).is_file()):
-            print("File " + str(wrf_nc_file) + " does not exist")
-            continue
-        elif not (Path(gsmap_file).is_file()):
-            print("File " + str(gsmap_file) + " does not exist")
-            continue
-        else:
-
-            wrf_ds = salem.open_xr_dataset(wrf_nc_file)
-            gsmap = salem.open_xr_dataset(gsmap_file)["precip"]
-
-            wrf_rain = wrf_ds["rain"].isel(time=(wrf_ds.time.dt.day == yyyymmdd.day))
-            wrf_rain = wrf_rain.sel(lat=slice(*YLIM), lon=slice(*XLIM))
-            print(wrf_rain)
-            wrf_rain = wrf_rain.mean("ens").sum("time")
-
-            regridder = xe.Regridder(wrf_rain, gsmap, "bilinear")
-            wrf_rain_re = regridder(wrf_rain)
-
-            c += 1
-            wrf = wrf_rain_re
-            # wrf = d1.variables["p24"][:, :]
-
-            # gsmap = d2.variables["rsum"][:, :]
-
-            for j, cat in enumerate(df.index):
 
-                CONT = funcs[j](wrf[:, :], gsmap[:, :])
+    # last 7 days
+    days = [init_dt_utc - timedelta(days=i) for i in range(0, 7)]
 
-                # Contingency table values
-
-                hit = np.count_nonzero(CONT == 4)
-                f_alarm = np.count_nonzero(CONT == 3)
-                miss = np.count_nonzero(CONT == 2)
-                c_neg = np.count_nonzero(CONT == 1)
-
-                df.at[cat, "hit"] += hit
-                df.at[cat, "f_alarm"] += f_alarm
-                df.at[cat, "miss"] += miss
-                df.at[cat, "c_neg"] += c_neg
-
-                df.at[cat, "fcst_yes"] += hit + f_alarm
-                df.at[cat, "fcst_no"] += miss + c_neg
-                df.at[cat, "obs_yes"] += hit + miss
-                df.at[cat, "obs_no"] += f_alarm + c_neg
-                df.at[cat, "total_obs"] += (
-                    df.at["total", "obs_yes"] + df.at["total", "obs_no"]
-                )
-                df.at[cat, "total_fcst"] += (
-                    df.at["total", "fcst_yes"] + df.at["total", "fcst_no"]
-                )
-
-                # Forecast metrics
-                # Check for division by zero
-                if (hit + miss) != 0 and (hit + f_alarm) != 0:
-
-                    df.at[cat, "pod"] += (hit / (hit + miss)) * 100
-                    df.at[cat, "far"] += (f_alarm / (hit + f_alarm)) * 100
-                    df.at[cat, "sr"] += (hit / (hit + f_alarm)) * 100
-
-                # log offset for weekly averaging if there is division by zero
-                elif (hit + miss) == 0:
-                    df.at[cat, "pod_ave_offset"] += 1
-                    offset_pod.append(cat)
-                elif (hit + f_alarm) == 0:
-                    df.at[cat, "far_sr_ave_offset"] += 1
-                    offset_far_sr.append(cat)
-
-    # Save offsets
-    df_offsets = df[df.columns[13:15]]
-
-    # Compute week average except offset columns
-    df = df[df.columns[:13]] / c
-    df = pd.concat([df, df_offsets], axis=1)
-
-    # Divide pod,far, or sr by c-offset to account for days with division by 0
-    # for pod, far, and sr
-    for cat_offset in offset_pod:
-        df.at[cat_offset, "pod"] *= c / (c - df.at[cat_offset, "pod_ave_offset"])
-        # print('offset averaging of pod '+ cat_offset + ' by '
-        #  + str(df.at[cat_offset, 'pod_ave_offset']))
-
-    for cat_offset in offset_far_sr:
-        df.at[cat_offset, "far"] *= c / (c - df.at[cat_offset, "far_sr_ave_offset"])
-        df.at[cat_offset, "sr"] *= c / (c - df.at[cat_offset, "far_sr_ave_offset"])
-        # print('offset averaging of far and sar '+ cat_offset + ' by '
-        #  + str(df.at[cat_offset, 'far_sr_ave_offset']))
-
-    return out_dir, yyyymmdd, zz, df[df.columns[:13]]
+    return out_dir, days[-1], zz, average_table(daily_counts(days))
 
 
 def plot_cont(outdir, date, init_var, df_var, duration):
@@ -393,45 +325,22 @@ def plot_cont(outdir, date, init_var, df_var, duration):
     print("Saved " + out_file)
 
 
-# Get sundays of month
-
-
-def allsundays_compute_month_average(date_var, outdir):
+def monthAverage(date_var, outdir):
+    """Average of the daily contingency tables of the month before date_var,
+    from the daily counts of every day of that month (at the init hour of
+    date_var)."""
     last_day_of_prev_month = date_var.replace(day=1) - timedelta(days=1)
-    date_var = date_var.replace(day=1) - timedelta(days=last_day_of_prev_month.day)
-
-    d = date_var
-    d += timedelta(days=6 - d.weekday())
-
-    # Counter for averaging
-    c = 0
-
-    # intialize dataframe
-    df = init_df()
-    df = df[df.columns[:13]]
+    first_day_of_prev_month = last_day_of_prev_month.replace(day=1)
 
     print("Computing month average contingency tables ...")
 
-    # Set allowance for weeks that overlap between months
-    if d.day > 4:
-        # print("yes")
-        # print(d)
-        d_str = d.strftime("%Y%m%d")
-        df += weekAverage(d, outdir)[-1]
-        c += 1
-
-    while d.month == date_var.month:
-        d += timedelta(days=7)
-
-        # Set allowance for weeks that overlap between months
-        if d.month == date_var.month or d.day < 3:
-            print("yes")
-            d_str = d.strftime("%Y%m%d")
-            outdir, today, init, df_var = weekAverage(d, outdir)
-            df += df_var
-            c += 1
+    days = [
+        first_day_of_prev_month + timedelta(days=i)
+        for i in range(last_day_of_prev_month.day)
+    ]
 
-    return outdir, today, init, (df / c)
+    # plot_cont labels the month of the 6 days before the returned date
+    return outdir, days[-1], outdir.name, average_table(daily_counts(days))
 
 
 if __name__ == "__main__":
@@ -465,28 +374,29 @@ if __name__ == "__main__":
 
         print("Computing week average of daily contingency tables")
 
-        d_str = init_dt_utc.strftime("%Y%m%d")
-        outdir, today_var, init_var, df_var = weekAverage(d_str, out_dir)
-        plot_cont(outdir, today_var, init_var, df_var, "Week")
-
-        print("Done with week average!")
+        outdir, today_var, init_var, df_var = weekAverage(init_dt_utc, out_dir)
+        if df_var is None:
+            print("No daily contingency counts for the week")
+        else:
+            plot_cont(outdir, today_var, init_var, df_var, "Week")
+            print("Done with week average!")
 
     # set monthly averaging to occur every 5th of month
     # to give allowance for weeks that overlap into first
     # few days of month
     if init_dt_utc.day == 5:
-        print("Getting month average contingency table from weekly averages")
+        print("Getting month average contingency table from daily counts")
         outdir = Path(f"/home/modelman/forecast/output/validation/{yyyymmdd}/00")
-        _, today_var, init_var, df_var = allsundays_compute_month_average(
-            init_dt_utc, out_dir
-        )
+        _, today_var, init_var, df_var = monthAverage(init_dt_utc, out_dir)
 
-        plot_cont(
-            outdir,
-            today_var,
-            init_var,
-            df_var,
-            "Month",
-        )
-
-        print("Done with month average!")
+        if df_var is None:
+            print("No daily contingency counts for the month")
+        else:
+            plot_cont(
+                outdir,
+                today_var,
+                init_var,
+                df_var,
+                "Month",
+            )
+            print("Done with month average!")
@@ -1,4 +1,188 @@
+import os
+import sys
+from pathlib import Path
+
 import numpy as np
+import xarray as xr
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+sys.path.append(f"{os.getenv('MAINDIR')}/validation/scripts/helpers")
+from skill_scores import skill_scores  # noqa: E402
+
+# Rainfall classes shared by every contingency category:
+# 0 = missing/negative, 1 = no rain, 2 = trace (< 0.1 mm),
+# 3 = dry, 4 = low, 5 = moderate, 6 = heavy, 7 = extreme
+CATEGORY_EDGES = (0.1, 5, 20, 35, 50)
+N_CLASSES = len(CATEGORY_EDGES) + 3
+CATEGORIES = ["total", "dry", "low", "mod", "heavy", "ext"]
+OUTCOMES = ["hit", "f_alarm", "miss", "c_neg"]
+
+# per-day count artifacts written by forecast_verification.py
+counts_dir = Path(
+    os.getenv(
+        "CONTINGENCY_COUNTS_DIR",
+        Path.home() / ".cache" / "validation" / "contingency_counts",
+    )
+)
+
+
+def _build_code_lut():
+    lut = np.zeros((len(CATEGORIES), N_CLASSES, N_CLASSES), dtype=np.float32)
+    rain = np.arange(N_CLASSES) >= 3
+
+    # total rainfall: any rain versus no rain
+    yes = np.arange(N_CLASSES) >= 2
+    no = np.arange(N_CLASSES) == 1
+    lut[0][np.ix_(yes, yes)] = 4  # hit
+    lut[0][np.ix_(yes, no)] = 3  # false alarm
+    lut[0][np.ix_(no, yes)] = 2  # miss
+    lut[0][np.ix_(no, no)] = 1  # correct negative
+
+    for icat in range(1, len(CATEGORIES)):
+        event = np.arange(N_CLASSES) == icat + 2
+        non_event = rain & ~event
+        lut[icat][np.ix_(event, event)] = 4  # hit
+        lut[icat][np.ix_(event, non_event)] = 3  # false alarm
+        lut[icat][np.ix_(non_event, event)] = 2  # miss
+        lut[icat][np.ix_(non_event, non_event)] = 1  # correct negative
+        lut[icat][1, :] = np.nan  # no rain case
+        lut[icat][:, 1] = np.nan
+    return lut
+
+
+CODE_LUT = _build_code_lut()
+
+
+def classify_rain(rain):
+    """Bin rainfall into the contingency classes (uint8 array)."""
+    rain = np.asarray(rain)
+    # NaN compares False everywhere and stays in class 0
+    cls = (rain >= 0).view(np.uint8) + (rain > 0)
+    for edge in CATEGORY_EDGES:
+        cls += rain >= edge
+    return cls
+
+
+def joint_counts(fcst_cls, obs_cls):
+    """Count gridpoints for every (forecast class, observed class) pair.
+
+    Returns an (N_CLASSES, N_CLASSES) int64 matrix, forecast along rows.
+    """
+    joint = fcst_cls * np.uint8(N_CLASSES) + obs_cls
+    return np.bincount(joint.ravel(), minlength=N_CLASSES**2).reshape(
+        N_CLASSES, N_CLASSES
+    )
+
+
+def category_counts(joint):
+    """Derive hit, false alarm, miss and correct negative counts per category.
+
+    joint may be a single joint count matrix or a stack of them (..., N_CLASSES,
+    N_CLASSES). Returns a (..., len(CATEGORIES), 4) int64 array ordered as
+    CATEGORIES.
+    """
+    codes = np.array([4, 3, 2, 1])
+    masks = CODE_LUT[:, None, :, :] == codes[None, :, None, None]
+    joint = np.asarray(joint)[..., None, None, :, :]
+    return (masks * joint).sum(axis=(-2, -1))
+
+
+def category_codes(fcst_cls, obs_cls, cat):
+    """Per-gridpoint contingency codes (4 hit, 3 false alarm, 2 miss,
+    1 correct negative, nan no rain) of one category from the class maps."""
+    return CODE_LUT[CATEGORIES.index(cat)][fcst_cls, obs_cls]
+
+
+def calculate_contingencies(fcst, obs):
+    """Classify forecast and observation once and count every category.
+
+    Returns the class maps, the joint count matrix and the per-category
+    counts (see category_counts).
+    """
+    fcst_cls = classify_rain(fcst)
+    obs_cls = classify_rain(obs)
+    joint = joint_counts(fcst_cls, obs_cls)
+    return fcst_cls, obs_cls, joint, category_counts(joint)
+
+
+if numba is not None:
+    # homogeneous float tuple, so numba treats the edges as constants
+    _EDGES = tuple(float(edge) for edge in CATEGORY_EDGES)
+
+    @numba.njit(inline="always")
+    def _rain_class(rain):
+        # same bins as classify_rain, NaN fails every comparison -> class 0
+        cls = (rain >= 0) + (rain > 0)
+        for edge in _EDGES:
+            cls += rain >= edge
+        return cls
+
+    @numba.njit(parallel=True, cache=True)
+    def _stack_joint_counts_numba(fcst, obs):
+        nt, ne, ny, nx = fcst.shape
+        joint = np.zeros((nt, ne, N_CLASSES**2), dtype=np.int64)
+        for k in numba.prange(nt * ne):
+            t, e = k // ne, k % ne
+            # classify a row first so that loop vectorizes, then count it into
+            # interleaved histograms to avoid stalling on repeated bins
+            row = np.empty(nx, dtype=np.uint8)
+            hist = np.zeros((4, N_CLASSES**2), dtype=np.int64)
+            for j in range(ny):
+                for i in range(nx):
+                    fcst_cls = _rain_class(fcst[t, e, j, i])
+                    row[i] = fcst_cls * N_CLASSES + _rain_class(obs[t, j, i])
+                for i in range(nx):
+                    hist[i & 3, row[i]] += 1
+            joint[t, e] = hist.sum(axis=0)
+        return joint.reshape(nt, ne, N_CLASSES, N_CLASSES)
+
+
+def _stack_joint_counts_numpy(fcst, obs):
+    nt, ne = fcst.shape[:2]
+    joint = np.zeros((nt, ne, N_CLASSES, N_CLASSES), dtype=np.int64)
+    for t in range(nt):
+        obs_cls = classify_rain(obs[t])
+        for e in range(ne):
+            joint[t, e] = joint_counts(classify_rain(fcst[t, e]), obs_cls)
+    return joint
+
+
+def stack_joint_counts(fcst, obs, backend=None):
+    """Joint class counts of every (time, ens) field of a forecast stack.
+
+    fcst is a (time, ens, lat, lon) array and obs a (time, lat, lon) or
+    (lat, lon) array on the same grid. With the numba backend every field is
+    classified and counted in one streaming pass that only keeps a row buffer;
+    the numpy backend classifies field by field. backend defaults to numba when it
+    is installed.
+
+    Returns a (time, ens, N_CLASSES, N_CLASSES) int64 array.
+    """
+    fcst = np.asarray(fcst)
+    obs = np.broadcast_to(np.asarray(obs), fcst.shape[:1] + fcst.shape[2:])
+
+    if backend is None:
+        backend = "numpy" if numba is None else "numba"
+    if backend == "numba":
+        if numba is None:
+            raise ImportError("numba is not installed, use backend='numpy'")
+        return _stack_joint_counts_numba(fcst, obs)
+    elif backend == "numpy":
+        return _stack_joint_counts_numpy(fcst, obs)
+    raise ValueError(f"Unknown backend {backend!r}")
+
+
+def stack_category_counts(fcst, obs, backend=None):
+    """Per-category counts of every (time, ens) field of a forecast stack.
+
+    Returns a (time, ens, len(CATEGORIES), 4) int64 array, see
+    stack_joint_counts and category_counts.
+    """
+    return category_counts(stack_joint_counts(fcst, obs, backend))
 
 
 def calculate_contingency(fcst, obs):
@@ -84,10 +268,12 @@ def calculate_cont_extreme(fcst, obs):
 
 
 def cont_table(cont):
-    hit = (cont == 4).sum()
-    f_alarm = (cont == 3).sum()
-    miss = (cont == 2).sum()
-    c_neg = (cont == 1).sum()
+    counts = np.array([(cont == code).sum() for code in (4, 3, 2, 1)])
+    return cont_table_counts(counts)
+
+
+def cont_table_counts(counts):
+    hit, f_alarm, miss, c_neg = counts
 
     fcst_yes = hit + f_alarm
     fcst_no = miss + c_neg
@@ -97,9 +283,10 @@ def cont_table(cont):
     totalfcst = fcst_yes + fcst_no
 
     # Forecast metrics
-    pod = (hit / (hit + miss)) * 100
-    far = (f_alarm / (hit + f_alarm)) * 100
-    sr = (hit / (hit + f_alarm)) * 100
+    scores = skill_scores(hit, f_alarm, miss, c_neg)
+    pod = scores["POD"] * 100
+    far = scores["FAR"] * 100
+    sr = scores["SR"] * 100
 
     # Format to whole number
     pod = f"{pod:0.2f} %"
@@ -114,3 +301,46 @@ def cont_table(cont):
     ]
 
     return (pod, far, sr, data)
+
+
+def counts_file(init_dt_utc):
+    return counts_dir / f"contingency_counts_{init_dt_utc:%Y-%m-%d_%H}.nc"
+
+
+def save_daily_counts(init_dt_utc, joint, counts):
+    """Store the joint class matrix and per-category counts of one day."""
+    ds = xr.Dataset(
+        {
+            "joint": (("fcst_class", "obs_class"), np.asarray(joint, dtype=np.int64)),
+            "counts": (("category", "outcome"), np.asarray(counts, dtype=np.int64)),
+        },
+        coords={
+            "fcst_class": np.arange(N_CLASSES),
+            "obs_class": np.arange(N_CLASSES),
+            "category": CATEGORIES,
+            "outcome": OUTCOMES,
+        },
+        attrs={
+            "title": "WRF versus GSMaP 24-hr rainfall contingency counts",
+            "init": f"{init_dt_utc:%Y-%m-%d_%H} UTC",
+            "category_edges": list(CATEGORY_EDGES),
+        },
+    )
+    out_file = counts_file(init_dt_utc)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file first so the aggregation never reads a
+    # partially written artifact
+    tmp_file = out_file.with_suffix(f".{os.getpid()}.tmp")
+    ds.to_netcdf(tmp_file)
+    os.replace(tmp_file, out_file)
+    return out_file
+
+
+def load_daily_counts(init_dt_utc):
+    """Per-category counts (len(CATEGORIES), 4) of one day, None if the
+    artifact does not exist."""
+    in_file = counts_file(init_dt_utc)
+    if not in_file.is_file():
+        return None
+    with xr.open_dataset(in_file) as ds:
+        return ds["counts"].sel(category=CATEGORIES, outcome=OUTCOMES).values
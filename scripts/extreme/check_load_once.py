@@ -0,0 +1,41 @@
+# Title: Check of the load-once contingency pipelines
+# Description: Builds the dataset_op and dataset_lead of the configured forecast
+#   date (FCST_YYYYMMDD, FCST_ZZ) and reads forecast, observed, ari_forecast
+#   and ari_observed of each twice. Checks with open_counts that every input
+#   file (WRF product or hourly file, GSMaP files) was opened once per instance.
+
+import os
+import sys
+from collections import Counter
+
+sys.path.append(f"{os.getenv('MAINDIR')}/validation/scripts/helpers")
+from contingency_preproc import dataset_lead, dataset_op, open_counts  # noqa: E402
+
+PROPERTIES = ["forecast", "observed", "ari_forecast", "ari_observed"]
+
+
+def instance_opens(datasets):
+    """Opens per file while the properties of datasets are read twice."""
+    _before = Counter(open_counts)
+    for _ in range(2):
+        for prop in PROPERTIES:
+            getattr(datasets, prop)
+    return open_counts - _before
+
+
+def main():
+    failed = False
+    for name, make in (("dataset_op", dataset_op), ("dataset_lead", dataset_lead)):
+        opens = instance_opens(make())
+        print(f"{name}: {len(opens)} files opened")
+        for path, count in sorted(opens.items()):
+            print(f"  {count} x {path}")
+        if any(count != 1 for count in opens.values()):
+            print(f"{name} opened an input more than once!")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
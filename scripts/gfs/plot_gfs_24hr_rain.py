@@ -7,8 +7,7 @@ from pathlib import Path
 import pandas as pd
 import salem
 
-import matplotlib.pyplot as plt
-from helpers.plot import plot_map
+from helpers.render_farm import render_maps
 
 gfs_dir = os.getenv("GFS_NC_DIR")
 
@@ -36,6 +35,7 @@ var_opts = {
 
 def main(in_file, out_dir):
 
+    jobs = []
     for it in range(5):
         ds = salem.open_xr_dataset(in_file)
 
@@ -55,16 +55,15 @@ def main(in_file, out_dir):
         ] = f"{var_opts['title']}\ninitialized {init_dt_str} PHT\nvalid from {dt1_str} to {dt2_str} PHT"
         # plt_opts["annotation"] = f"GFS initialized at {init_dt_str} PHT."
 
-        fig = plot_map(da, plt_opts)
-
         out_file = out_dir / f"gfs-24hr_rain_day{it+1}_{init_dt_str2}PHT.png"
-        fig.savefig(out_file, bbox_inches="tight", dpi=300)
-        plt.close("all")
+        jobs.append((da, plt_opts, out_file))
 
         init_dt = init_dt - timedelta(1)
         init_dt_str = init_dt.strftime("%Y-%m-%d_%H")
         in_file = f"{gfs_dir}/gfs_{init_dt_str}_day.nc"
 
+    render_maps(jobs)
+
 
 if __name__ == "__main__":
     in_file = Path("dat")
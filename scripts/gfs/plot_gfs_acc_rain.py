@@ -6,9 +6,8 @@ from pathlib import Path
 import pandas as pd
 import salem
 
-import matplotlib.pyplot as plt
-
-from helpers.plot import plot_map
+from helpers.accumulate import accumulated_totals
+from helpers.render_farm import render_maps
 
 tz = pytz.timezone("Asia/Manila")
 
@@ -75,18 +74,18 @@ def main(in_file, out_dir):
     init_dt_str = init_dt.strftime("%Y-%m-%d %H")
     init_dt_str2 = init_dt.strftime("%Y-%m-%d_%H")
 
-    da = None
-    for it in range(3):
-        _da = ds[var_name].isel(time=it)
-        if it == 0:
-            da = _da.copy()
-            continue
-        else:
-            da.values = da.values + _da.values
+    # 24, 48 and 72-hr totals from the first time step in one pass
+    acc = accumulated_totals(
+        ds[var_name], start=ds.time.values[0], lengths=[24, 48, 72]
+    )
+
+    jobs = []
+    for it in range(1, 3):
+        da = acc.isel(hours=it)
 
         plt_opts = var_opts[it]
 
-        dt1 = pd.to_datetime(_da.time.values, utc=True).astimezone(tz)
+        dt1 = pd.to_datetime(ds.time.values[it], utc=True).astimezone(tz)
         # dt1_str = dt1.strftime("%Y-%m-%d %H")
         dt2 = dt1 + timedelta(days=1)
         dt2_str = dt2.strftime("%Y-%m-%d %H")
@@ -95,11 +94,10 @@ def main(in_file, out_dir):
         ] = f"{plt_opts['title']}\nValid from {init_dt_str} to {dt2_str} PHT"
         plt_opts["annotation"] = f"GFS initialized at {init_dt_str} PHT."
 
-        fig = plot_map(da, plt_opts)
-
         out_file = out_dir / f"gfs-{24*(it+1)}hr_rain_day0_{init_dt_str2}PHT.png"
-        fig.savefig(out_file, bbox_inches="tight", dpi=300)
-        plt.close("all")
+        jobs.append((da, plt_opts, out_file))
+
+    render_maps(jobs)
 
 
 if __name__ == "__main__":
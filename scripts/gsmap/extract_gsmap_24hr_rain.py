@@ -1,3 +1,4 @@
+import os
 import sys
 import getopt
 import pytz
@@ -5,39 +6,64 @@ from pathlib import Path
 import pandas as pd
 import salem
 
+sys.path.append(f"{os.getenv('MAINDIR')}/validation/scripts/helpers")
+from station_extract import (  # noqa: E402
+    extract_points,
+    write_legacy_csvs,
+    write_stations_csv,
+)
+
 tz = pytz.timezone("Asia/Manila")
 var_name = "precip"
 
 
-def extract(in_file, out_dir):
-    stn_df = pd.read_csv(Path("../../input/csv/station.csv"))
+def extract(in_file, out_dir, legacy=True, method="nearest"):
+    stn_file = Path("../../input/csv/station.csv")
     ds = salem.open_xr_dataset(in_file)
 
     init_dt = pd.to_datetime(ds.time.values[0], utc=True).astimezone(tz)
     # init_dt_str = init_dt.strftime("%Y-%m-%d %H")
     init_dt_str2 = init_dt.strftime("%Y-%m-%d_%H")
 
-    for irow, row in stn_df.iterrows():
-        df = ds.sel(lat=row["lat"], lon=row["lon"], method="nearest").to_dataframe()
-        out_file = out_dir / f"gsmap_{init_dt_str2}PHT_{row['name']}_pr.csv"
-        df[var_name].head(25).to_csv(out_file, index=False, header=False)
+    # all stations at once, only the first 25 time steps are written
+    points = extract_points(ds[[var_name]], stn_file, method, time=slice(25)).load()
+
+    out_file = out_dir / f"gsmap_{init_dt_str2}PHT_stations_pr.csv"
+    write_stations_csv(points, var_name, out_file)
+    if legacy:
+        file_fmt = f"gsmap_{init_dt_str2}PHT_{{name}}_pr.csv"
+        write_legacy_csvs(points, var_name, out_dir, file_fmt)
 
 
 if __name__ == "__main__":
     in_file = Path("dat")
     out_dir = Path("")
+    legacy = True
+    method = "nearest"
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "hi:o:", ["ifile=", "odir="])
+        opts, args = getopt.getopt(
+            sys.argv[1:], "hi:o:m:", ["ifile=", "odir=", "method=", "no-legacy"]
+        )
     except getopt.GetoptError:
-        print("extract_gsmap_24hr_rain.py -i <input file> -o <output dir>")
+        print(
+            "extract_gsmap_24hr_rain.py -i <input file> -o <output dir> "
+            "[-m nearest|bilinear] [--no-legacy]"
+        )
         sys.exit(2)
     for opt, arg in opts:
         if opt == "-h":
-            print("extract_gsmap_24hr_rain.py -i <input file> -o <output dir>")
+            print(
+                "extract_gsmap_24hr_rain.py -i <input file> -o <output dir> "
+                "[-m nearest|bilinear] [--no-legacy]"
+            )
             sys.exit()
         elif opt in ("-i", "--ifile"):
             in_file = Path(arg)
         elif opt in ("-o", "--odir"):
             out_dir = Path(arg)
             out_dir.mkdir(parents=True, exist_ok=True)
-    extract(in_file, out_dir)
+        elif opt in ("-m", "--method"):
+            method = arg
+        elif opt == "--no-legacy":
+            legacy = False
+    extract(in_file, out_dir, legacy, method)
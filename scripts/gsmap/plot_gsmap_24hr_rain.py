@@ -5,9 +5,7 @@ from pathlib import Path
 import pandas as pd
 import salem
 
-import matplotlib.pyplot as plt
-
-from helpers.plot import plot_map
+from helpers.render_farm import render_maps
 
 tz = pytz.timezone("Asia/Manila")
 
@@ -44,11 +42,8 @@ def main(in_file, out_dir):
 
     var_opts["title"] = f"{var_opts['title']}\nfrom {init_dt_str} PHT"
     var_opts["annotation"] = f"GSMaP (gauge calibrated) at {init_dt_str} PHT."
-    fig = plot_map(da, var_opts)
-
     out_file = out_dir / f"gsmap-24hr_rain_{init_dt_str2}PHT.png"
-    fig.savefig(out_file, bbox_inches="tight", dpi=300)
-    plt.close("all")
+    render_maps([(da, var_opts, out_file)])
 
 
 if __name__ == "__main__":
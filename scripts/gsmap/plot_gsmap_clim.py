@@ -5,12 +5,12 @@ import pytz
 from pathlib import Path
 import pandas as pd
 import salem
-import xesmf as xe
 
-import matplotlib.pyplot as plt
 import seaborn as sns
 
-from helpers.plot import plot_map, XLIM, YLIM
+from helpers.grid_cache import get_regridder
+from helpers.plot import XLIM, YLIM
+from helpers.render_farm import render_maps
 
 trmm_clim_dir = Path(os.getenv("TRMM_CLIM_DIR"))
 aphro_clim_dir = Path(os.getenv("APHRODITE_CLIM_DIR"))
@@ -84,6 +84,7 @@ def main(in_file, out_dir):
     init_dt_str = init_dt.strftime("%Y-%m-%d %H")
     init_dt_str2 = init_dt.strftime("%Y-%m-%d_%H")
 
+    jobs = []
     for clim_dat in clim_dats:
         for f in clim_dat["files"]:
             clim_file = clim_dat["path"] / f"{f['name']}_{init_dt:%m}.nc"
@@ -95,7 +96,7 @@ def main(in_file, out_dir):
             clim_rain = clim_ds[clim_dat["var_name"]].isel(time=0)
             clim_rain = clim_rain.sel(lat=slice(*YLIM), lon=slice(*XLIM))
 
-            regridder = xe.Regridder(gsmap, clim_rain, "bilinear")
+            regridder = get_regridder(gsmap, clim_rain, "bilinear")
             gsmap_re = regridder(gsmap)
 
             da = (gsmap_re / clim_rain) * 100
@@ -107,15 +108,15 @@ def main(in_file, out_dir):
             plt_opts[
                 "annotation"
             ] = f"GSMaP (gauge calibrated) at {init_dt_str} PHT.\n{clim_dat['label']} {f['annotation']} for {init_dt:%b}"
-            fig = plot_map(da, plt_opts)
 
             out_file_pref = "gsmap"
             out_file = (
                 out_dir
                 / f"{out_file_pref}-24hr_rain_day0_{clim_dat['name']}_{f['type']}_{init_dt_str2}PHT.png"
             )
-            fig.savefig(out_file, bbox_inches="tight", dpi=300)
-            plt.close("all")
+            jobs.append((da, plt_opts, out_file))
+
+    render_maps(jobs)
 
 
 if __name__ == "__main__":
@@ -1,62 +1,75 @@
-import numpy as np 
+import numpy as np
 import pandas as pd
-import xarray as xr 
-import salem
-import xesmf as xe
+import xarray as xr
 from scipy.interpolate import interp1d
 
-import os
-from pathlib import Path
+from grid_cache import get_regridder
+from land_mask import apply_land_mask
+from reference_data import phil_ari, trmm_grid
 
-script_dir = Path(f"{os.getenv('SCRIPT_DIR')}/python/resources") 
 
 def regrid(ds, _ds_out):
-    return xe.Regridder(ds, _ds_out, "bilinear")(ds)
+    return get_regridder(ds, _ds_out, "bilinear")(ds)
 
 
 def mask(ds):
-    _mask = salem.read_shapefile(
-        script_dir / "shp/PHL_adm0/PHL_adm0.shp"
-    )
-    _ds_mask = ds.salem.roi(shape=_mask)
-
-    return _ds_mask
+    return apply_land_mask(ds)
 
 
 def interpd(_newx, _vals, _idxs):
     return interp1d(_vals, _idxs, bounds_error=False, fill_value="extrapolate")(_newx)
 
 
+def interpd_vectorized(_newx, _vals, _idxs):
+    """Same as interpd for every grid cell at once.
+
+    _newx (..., time) is interpolated on the per-cell curves _vals (..., ari)
+    to _idxs (..., ari) using a batched searchsorted instead of one interp1d
+    per cell. Leading dims broadcast like in a numpy ufunc.
+    """
+    _vals, _idxs = np.broadcast_arrays(_vals, _idxs)
+    _order = np.argsort(_vals, axis=-1, kind="stable")
+    _xp = np.take_along_axis(_vals, _order, axis=-1)
+    _fp = np.take_along_axis(_idxs, _order, axis=-1)
+
+    # searchsorted(_xp, _newx, side="left") along the ari axis of each cell
+    _hi = (_xp[..., None, :] < _newx[..., :, None]).sum(axis=-1)
+    _hi = _hi.clip(1, _xp.shape[-1] - 1)
+    _lo = _hi - 1
+
+    _x_lo = np.take_along_axis(_xp, _lo, axis=-1)
+    _x_hi = np.take_along_axis(_xp, _hi, axis=-1)
+    _y_lo = np.take_along_axis(_fp, _lo, axis=-1)
+    _y_hi = np.take_along_axis(_fp, _hi, axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        _slope = (_y_hi - _y_lo) / (_x_hi - _x_lo)
+    return _slope * (_newx - _x_lo) + _y_lo
+
+
 def ARIinterp(_newx):
-    _ph_ari_file = script_dir / "nc/PHIL_ARI.nc"
-    _dat = xr.open_dataset(f"{_ph_ari_file}").rename({"precip": "rain"})
+    _dat = phil_ari()
 
     _ari = [1, 2, 5, 10, 25, 30, 50, 100, 200, 500, 1000]
     _idx = xr.DataArray(_ari, dims=["ari"]).broadcast_like(_dat).to_dataset(name="rain")
 
     _ari_interpd = xr.apply_ufunc(
-        interpd,
+        interpd_vectorized,
         _newx,
         _dat,
         _idx,
         input_core_dims=[["time"], ["ari"], ["ari"]],
         output_core_dims=[["time"]],
-        vectorize=True,
         dask="parallelized",
+        output_dtypes=[float],
     )
     return _ari_interpd
 
+
 def wrf_ari(ds):
     _ds = ds.mean("ens").rename({"lon": "longitude", "lat": "latitude"})
 
-    _trmm = (
-        xr.open_dataset(script_dir / "nc/trmm_domain_regrid.nc")
-        .rename({"precipitation": "rain", "lon": "longitude", "lat": "latitude"})
-        .sel(longitude=slice(117.375, 126.375), latitude=slice(5.125, 18.875))
-        .drop("time_bnds")
-    )
-
-    _ds_out = _trmm.drop(("time", "rain"))
+    _ds_out = trmm_grid()
 
     _wrf_inp = mask(regrid(_ds, _ds_out))
     _wrf_ari = ARIinterp(_wrf_inp)
@@ -67,18 +80,9 @@ def wrf_ari(ds):
 def gsmap_ari(ds):
     _ds = ds.rename({"precip": "rain"})
 
-    _trmm = (
-        xr.open_dataset(script_dir / "nc/trmm_domain_regrid.nc")
-        .rename({"precipitation": "rain", "lon": "longitude", "lat": "latitude"})
-        .sel(longitude=slice(117.375, 126.375), latitude=slice(5.125, 18.875))
-        .drop("time_bnds")
-    )
-
-    _ds_out = _trmm.drop(("time", "rain"))
+    _ds_out = trmm_grid()
 
     _wrf_inp = mask(regrid(_ds, _ds_out))
     _wrf_ari = ARIinterp(_wrf_inp)
 
     return _wrf_ari
-
-
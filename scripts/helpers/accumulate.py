@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+
+def naive_utc(time):
+    """Timestamp as naive UTC, like the time coordinates of the input files."""
+    time = pd.Timestamp(time)
+    if time.tzinfo is not None:
+        time = time.tz_convert("UTC").tz_localize(None)
+    return time
+
+
+def anchor_start(da, anchor_hour=8, utc_offset=8, dim="time"):
+    """Start of the first window anchored at anchor_hour (local time, UTC +
+    utc_offset hours) that contains the first time step of da, i.e. the bin
+    start of resample(time="24H", base=<anchor hour in UTC>)."""
+    first = pd.Timestamp(da[dim].values[0])
+    start = first.normalize() + pd.Timedelta(hours=(anchor_hour - utc_offset) % 24)
+    if start > first:
+        start -= pd.Timedelta(hours=24)
+    return start
+
+
+def window_totals(da, starts, ends, dim="time"):
+    """Totals of da over the windows [starts[i], ends[i]) along dim.
+
+    One cumulative sum over dim is differenced at the window edges, so any
+    number of (overlapping) windows costs a single pass over the data. Time
+    steps are assigned to windows by their label, as in resample and .sel
+    slices; missing values count as zero, as in .sum(). Returns an array with
+    a "window" dimension in place of dim.
+    """
+    starts = np.array([naive_utc(t) for t in starts], dtype="datetime64[ns]")
+    ends = np.array([naive_utc(t) for t in ends], dtype="datetime64[ns]")
+    times = da[dim].values
+
+    _axis = da.get_axis_num(dim)
+    _values = np.moveaxis(np.nan_to_num(da.values), _axis, 0)
+    _cum = np.zeros((len(times) + 1,) + _values.shape[1:])
+    np.cumsum(_values, axis=0, out=_cum[1:])
+
+    _i0 = np.searchsorted(times, starts)
+    _i1 = np.searchsorted(times, ends)
+    _totals = np.moveaxis(_cum[_i1] - _cum[_i0], 0, _axis)
+
+    _dims = list(da.dims)
+    _dims[_axis] = "window"
+    _coords = {
+        name: coord
+        for name, coord in da.coords.items()
+        if dim not in coord.dims and name != dim
+    }
+    return xr.DataArray(
+        _totals, dims=_dims, coords=_coords, name=da.name, attrs=da.attrs
+    )
+
+
+def consecutive_totals(da, start=None, hours=24, count=None, dim="time"):
+    """Totals over consecutive windows of hours (e.g. 3, 6, 12 or 24) from
+    start (default: anchor_start of da), labelled along dim by window start.
+
+    count limits the number of windows; by default all windows that start
+    within the data are returned.
+    """
+    start = anchor_start(da, dim=dim) if start is None else naive_utc(start)
+    if count is None:
+        _last = pd.Timestamp(da[dim].values[-1])
+        count = int((_last - start) // pd.Timedelta(hours=hours)) + 1
+    starts = pd.date_range(start, periods=count, freq=pd.Timedelta(hours=hours))
+    ends = starts + pd.Timedelta(hours=hours)
+
+    totals = window_totals(da, starts, ends, dim=dim)
+    return totals.rename(window=dim).assign_coords({dim: starts.values})
+
+
+def accumulated_totals(da, start=None, lengths=(24, 48, 72, 120), dim="time"):
+    """Totals over the first lengths hours from start (default: anchor_start
+    of da), labelled by a "hours" dimension."""
+    start = anchor_start(da, dim=dim) if start is None else naive_utc(start)
+    ends = [start + pd.Timedelta(hours=hours) for hours in lengths]
+
+    totals = window_totals(da, [start] * len(ends), ends, dim=dim)
+    return totals.rename(window="hours").assign_coords(hours=list(lengths))
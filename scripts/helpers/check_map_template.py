@@ -0,0 +1,98 @@
+# Title: Check of the basemap template
+# Description: Draws several maps in a row with plot_map(..., template=True)
+#   and each again with plot_map on a new figure, and checks that the saved
+#   PNGs are pixel-identical. The maps differ in title length, levels, colors
+#   and annotation, so any layout or artist left over from the previous map
+#   on the template shows up as a difference.
+
+import io
+import sys
+
+import numpy as np
+import xarray as xr
+import matplotlib.pyplot as plt
+
+from helpers.plot import plot_map, reset_template
+
+RAIN_COLORS = [
+    "#ffffff",
+    "#0064ff",
+    "#01b4ff",
+    "#32db80",
+    "#9beb4a",
+    "#ffeb00",
+    "#ffb302",
+    "#ff6400",
+    "#eb1e00",
+    "#af0000",
+]
+
+
+def sample_maps(count=4, seed=0):
+    """(da, plt_opts) of count random rain and anomaly maps."""
+    rng = np.random.default_rng(seed)
+    lon = np.arange(114, 130.1, 0.25)
+    lat = np.arange(3, 22.1, 0.25)
+    maps = []
+    for i in range(count):
+        da = xr.DataArray(
+            rng.gamma(0.8, 40 * (i + 1), size=(lat.size, lon.size)),
+            coords=dict(lat=lat, lon=lon),
+            dims=("lat", "lon"),
+        )
+        if i % 2:
+            plt_opts = {
+                "title": f"Rainfall Difference {i}",
+                "units": "mm",
+                "levels": np.arange(-150, 175, 25),
+                "colors": [plt.get_cmap("BrBG", 14)(j) for j in range(14)],
+            }
+            da = da - da.mean()
+        else:
+            plt_opts = {
+                "title": f"24-hr Total Rainfall (mm/dy)\nday {i + 1}\nvalid to day {i}",
+                "units": "mm/day",
+                "levels": [5, 10, 20, 30, 50, 100, 150, 200, 250],
+                "colors": RAIN_COLORS,
+                "annotation": f"Sample map {i} annotation",
+            }
+        maps.append((da, plt_opts))
+    return maps
+
+
+def png_pixels(fig):
+    """Pixels of fig saved as the map scripts save it."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight", dpi=300)
+    buf.seek(0)
+    return plt.imread(buf)
+
+
+def main():
+    maps = sample_maps()
+    reset_template()
+    template_pngs = [
+        png_pixels(plot_map(da, plt_opts, template=True)) for da, plt_opts in maps
+    ]
+    reset_template()
+
+    failed = False
+    for i, ((da, plt_opts), template_png) in enumerate(zip(maps, template_pngs)):
+        fig = plot_map(da, plt_opts)
+        fresh_png = png_pixels(fig)
+        plt.close(fig)
+        if template_png.shape != fresh_png.shape:
+            print(f"map {i}: size {template_png.shape} differs from {fresh_png.shape}")
+            failed = True
+        elif not np.array_equal(template_png, fresh_png):
+            _diff = np.any(template_png != fresh_png, axis=-1).sum()
+            print(f"map {i}: {_diff} pixels differ from a new figure")
+            failed = True
+    if failed:
+        print("Template maps differ!")
+        sys.exit(1)
+    print(f"{len(maps)} maps: template and new figures match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Title: Check of the render farm
+# Description: Renders the sample maps of check_map_template with render_maps,
+#   across worker processes and in this process, and checks that every PNG is
+#   pixel-identical to the same map drawn serially with plot_map on a new
+#   figure and saved as the map scripts save it.
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from helpers.check_map_template import png_pixels, sample_maps
+from helpers.plot import plot_map
+from helpers.render_farm import render_maps
+
+
+def main():
+    maps = sample_maps(count=6)
+    serial_pngs = []
+    for da, plt_opts in maps:
+        fig = plot_map(da, plt_opts)
+        serial_pngs.append(png_pixels(fig))
+        plt.close(fig)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for workers in (3, 1):
+            jobs = [
+                (da, plt_opts, Path(tmp_dir) / f"map{i}_workers{workers}.png")
+                for i, (da, plt_opts) in enumerate(maps)
+            ]
+            results = render_maps(jobs, workers=workers)
+            for i, (result, serial_png) in enumerate(zip(results, serial_pngs)):
+                farm_png = plt.imread(result.out_file)
+                if farm_png.shape != serial_png.shape or not np.array_equal(
+                    farm_png, serial_png
+                ):
+                    print(f"map {i} ({workers} workers) differs from plot_map")
+                    failed = True
+    if failed:
+        print("Render farm maps differ!")
+        sys.exit(1)
+    print(f"{len(maps)} maps: render farm and serial plot_map match")
+
+
+if __name__ == "__main__":
+    main()
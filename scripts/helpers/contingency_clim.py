@@ -1,4 +1,27 @@
 from ARI import *
+from reference_data import trmm_clim, trmm_ref_grid
+from contingency_codes import *
+from functools import cached_property, wraps
+import time
+
+
+def _stage(func):
+    """Computed-once stage of Contingency_clim that records its own runtime."""
+    @wraps(func)
+    def _timed(self):
+        self._nested.append(0.0)
+        _start = time.perf_counter()
+        try:
+            return func(self)
+        finally:
+            _elapsed = time.perf_counter() - _start
+            # exclude the time spent computing upstream stages
+            self._timings[func.__name__] = _elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += _elapsed
+
+    return cached_property(_timed)
+
 
 class Contingency_clim:
     """Class for contingency based skill scores for each grid point in ARI than historgram 
@@ -22,6 +45,10 @@ class Contingency_clim:
     test = Contingency(gsmap_ari, wrf_ari, 1)
     to call hits do " test.hits "
     
+    Every intermediate (regridded fields, monthly climatology, ensemble
+    exceedance counts, agreement masks, contingency codes and table) is
+    computed once on first use; test.timings reports seconds per stage.
+    
     """
     import warnings
     warnings.filterwarnings("ignore")
@@ -33,9 +60,8 @@ class Contingency_clim:
     ):
         self._observed = observed.copy()
         self._forecasts = forecasts.copy()
-        self._observed_extreme, self._forecast_extreme = self._get_model_agreement()[:2]
-        self._hits, self._miss, self._false, self._non_event = self._get_contingency()
-        self._table = self._get_table()
+        self._timings = {}
+        self._nested = []
         
     @property
     def observed(self):
@@ -45,102 +71,73 @@ class Contingency_clim:
         return self._forecasts
     @property
     def observe(self):
-        return self._observed_extreme
+        return xr.where(self.agreement["observe"], 1, np.nan).to_dataset(name="rain")
     @property
     def forecast(self):
-        return self._forecast_extreme
-    @property
+        return xr.where(self.agreement["forecast"], 1, np.nan).to_dataset(name="rain")
+    @cached_property
     def hits(self):
-        return self._hits
-    @property
+        return outcome_map(self.codes, HITS, "hits")
+    @cached_property
     def miss(self):
-        return self._miss
-    @property
+        return outcome_map(self.codes, MISS, "miss")
+    @cached_property
     def false(self):
-        return self._false
-    @property
+        return outcome_map(self.codes, FALSE, "false")
+    @cached_property
     def non_event(self):
-        return self._non_event
+        return outcome_map(self.codes, NON_EVENT, "non_event")
     @property
-    def table(self):
-        return self._table
+    def timings(self):
+        return pd.Series(self._timings, name="seconds")
     
-    def _regrid_ds(self):
-        _observe = self.observed
-        _forecast = self.forecasts
-        _trmm = xr.open_dataset(script_dir / "nc/trmm_1998-2015_clim.nc")
+    @_stage
+    def regridded(self):
+        _ref_grid = trmm_ref_grid()
         
-        _ref_grid = (xr.open_dataset(script_dir / "nc/trmm_domain_regrid.nc")
-                    .sel(lon=slice(117.375, 126.375), lat=slice(5.125, 18.875))
-                    .drop(("time_bnds", "time", "precipitation")))
-        
-        _observe_regrid = mask(regrid(_observe, _ref_grid))
-        _forecast_regrid = mask(regrid(_forecast, _ref_grid))
-        _trmm_regrid = mask(regrid(_trmm, _ref_grid))
+        _observe_regrid = mask(regrid(self.observed, _ref_grid))
+        _forecast_regrid = mask(regrid(self.forecasts, _ref_grid))
+        _trmm_regrid = mask(regrid(trmm_clim(), _ref_grid))
         
         return (_observe_regrid, _forecast_regrid, _trmm_regrid)
     
-    def _get_model_agreement(self):
-        
-        _observe, _forecast, _trmm = self._regrid_ds()
+    @_stage
+    def clim_month(self):
+        _forecast, _trmm = self.regridded[1:]
         
         _trmm2 = _trmm.sel(time=(_trmm.time.dt.month == _forecast.time.dt.month[0])).isel(time=0)
-        _trmm2 = _trmm2.rename({"precipitation" : "rain"})
-        
-        _model_exceed = xr.where(_forecast.rain > _trmm2.rain, 1, np.nan)
-        _model_exceed =  _model_exceed.to_dataset(name="rain")
-        _model_counts = _model_exceed.where(_model_exceed == 1).sum("ens")
-        
-        _observe = _observe.rename({"precip" : "rain"})
-        _observe_extreme = xr.where(_observe.rain > _trmm2.rain, 1, np.nan)
-        _observe_extreme = _observe_extreme.to_dataset(name="rain")
-        
-        _forecast_extreme = xr.where(_model_counts.rain >= 2, 1, np.nan)
-        _forecast_extreme = _forecast_extreme.to_dataset(name="rain")
-        
-        _observed_non = xr.where(_observe.rain < _trmm2.rain, 1, np.nan)
-        _observed_non = _observed_non.to_dataset(name="rain")
-        
-        _forecast_non = xr.where(_model_counts.rain < 2, 1, np.nan)
-        _forecast_non = _forecast_non.to_dataset(name="rain")
-        
-        return (_observe_extreme, _forecast_extreme, _observed_non, _forecast_non)
+        return _trmm2.rename({"precipitation" : "rain"})
     
-    def _get_contingency(self):
-        
-        _observe, _forecast, _observe_non, _forecast_non = self._get_model_agreement()
-        _observe, _forecast = _observe["rain"], _forecast["rain"]
-        _observe_non, _forecast_non = _observe_non["rain"], _forecast_non["rain"]
-        
-        _hits = xr.where(_observe == _forecast, 1, np.nan)
-        
-        _miss = xr.where(_observe.where(_observe == 1).isin(_forecast.where(_forecast == 1)), 1, np.nan)
-        _miss = _miss.where((_miss - _hits) != 0)
-        
-        _false = _forecast.where( (_forecast - _observe) != 0)
-        
-        _non_event = xr.where(_forecast_non == _observe_non, 1, np.nan)
-        
-        _hits = _hits.to_dataset(name="hits")
-        _miss = _miss.to_dataset(name="miss")
-        _false = _false.to_dataset(name="false")
-        _non_event = _non_event.to_dataset(name="non_event")
+    @_stage
+    def exceed_counts(self):
+        _forecast = self.regridded[1]
         
-        return (_hits, _miss, _false, _non_event)
+        return (_forecast.rain > self.clim_month.rain).sum("ens")
     
-    def _get_table(self):
-        
-        _contigent_ds = xr.merge(self._get_contingency())
-        _contingent_df = _contigent_ds.count(dim=["lon", "lat"]).to_dataframe()
-        
-        _contingent_df["BIAS"] = _contingent_df.apply(lambda x: (x["hits"] + x["false"]) / (x["hits"] + x["miss"]), axis=1)
-        _contingent_df["POD"] = _contingent_df.apply(lambda x: x["hits"] / (x["hits"] + x["miss"]), axis=1)
-        _contingent_df["FAR"] = _contingent_df.apply(lambda x: x["false"] / (x["hits"] + x["false"]), axis=1)
-        _contingent_df["SR"] = _contingent_df.apply(lambda x: x["hits"] / (x["hits"] + x["false"]), axis=1)
-        _contingent_df["CSI"] = _contingent_df.apply(lambda x: x["hits"] / (x["hits"] + x["false"] + x["miss"]), axis=1)
-        _contingent_df["PCR"] = _contingent_df.apply(lambda x: x["non_event"] / (x["false"]+x["non_event"]), axis=1)
-
-        _var_ls = ["BIAS", "POD", "FAR", "SR", "CSI", "PCR"]
-        _contingent_df[_var_ls] = _contingent_df[_var_ls].round(3)
-
-        return _contingent_df
\ No newline at end of file
+    @_stage
+    def agreement(self):
+        _observe = self.regridded[0].rename({"precip" : "rain"})
+        _trmm2 = self.clim_month
+        _model_counts = self.exceed_counts
+        
+        return {
+            "observe": _observe.rain > _trmm2.rain,
+            "forecast": _model_counts >= 2,
+            "observe_non": _observe.rain < _trmm2.rain,
+            "forecast_non": _model_counts < 2,
+        }
+    
+    @_stage
+    def codes(self):
+        _agreement = self.agreement
+        
+        return outcome_codes(
+            _agreement["forecast"],
+            _agreement["observe"],
+            _agreement["forecast_non"],
+            _agreement["observe_non"],
+        )
+    
+    @_stage
+    def table(self):
+        return skill_table(outcome_counts(self.codes, ("lon", "lat")))
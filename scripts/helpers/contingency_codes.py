@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from skill_scores import SCORES, skill_scores
+
+# Per grid point outcome of a 2x2 contingency, stored as int8
+NONE, HITS, MISS, FALSE, NON_EVENT = range(5)
+OUTCOMES = ["hits", "miss", "false", "non_event"]
+
+
+def outcome_codes(forecast_event, observed_event, forecast_non, observed_non):
+    """int8 outcome code per grid point from boolean event/non-event masks.
+
+    Grid points that are neither an event nor a non-event in the forecast or
+    in the observation (e.g. missing data) only count as hits/miss/false where
+    the other side is an event, and get NONE otherwise.
+    """
+    _codes = (forecast_event & observed_event).astype(np.int8) * HITS
+    _codes += (observed_event & ~forecast_event).astype(np.int8) * MISS
+    _codes += (forecast_event & ~observed_event).astype(np.int8) * FALSE
+    _codes += (forecast_non & observed_non).astype(np.int8) * NON_EVENT
+    return _codes
+
+
+def outcome_map(codes, code, name):
+    """Map of one outcome (1 where it occurs, NaN elsewhere) as a Dataset."""
+    return xr.where(codes == code, 1, np.nan).to_dataset(name=name)
+
+
+def outcome_counts(codes, dims):
+    """Count every outcome over the grid dims (e.g. longitude and latitude)
+    with a single bincount.
+
+    Returns a DataFrame indexed by the other dimensions of codes (e.g. time)
+    with one column per outcome, like Dataset.count(dim=dims).to_dataframe().
+    """
+    _other = [dim for dim in codes.dims if dim not in dims]
+    _codes = codes.transpose(*_other, *dims).values
+    _n = int(np.prod(_codes.shape[: len(_other)]))
+    _codes = _codes.reshape(_n, -1)
+    _idx = np.arange(_n)[:, None] * (NON_EVENT + 1) + _codes
+    _counts = np.bincount(_idx.ravel(), minlength=_n * (NON_EVENT + 1))
+    _counts = _counts.reshape(_n, NON_EVENT + 1)[:, HITS:]
+    _index = codes.isel({dim: 0 for dim in dims}, drop=True).coords.to_index()
+    return pd.DataFrame(_counts, index=_index, columns=OUTCOMES)
+
+
+def skill_table(counts):
+    """Add the contingency skill scores to a table of outcome counts."""
+    _table = counts.copy()
+    _scores = skill_scores(
+        _table["hits"], _table["false"], _table["miss"], _table["non_event"]
+    )
+    for _score in SCORES:
+        _table[_score] = _scores[_score].round(3)
+
+    return _table
@@ -66,13 +66,12 @@ class config_lead:
 
     def _get_files(self):
         
-        from pathlib import Path
         _wrf_dir = Path(os.getenv("WRF_NC_DIR"))
         
-        _init_files = [_wrf_dir / f"wrf_{date}.nc" for date in self._forecast_dates]
-        _ref = [sorted(_wrf_dir.glob(f"*{date}*")) for date in self._forecast_dates]
-        _ref = [num for sublist in _ref for num in sublist]
-        _fnl_files = pd.Index(_init_files).intersection(_ref)
-        _forecast_index = pd.Index(_init_files).get_indexer(_fnl_files)
+        # one stat per expected init file instead of a glob of the directory per date
+        _init_files = pd.Index([_wrf_dir / f"wrf_{date}.nc" for date in self._forecast_dates])
+        _exists = np.array([file.is_file() for file in _init_files])
+        _fnl_files = _init_files[_exists]
+        _forecast_index = np.flatnonzero(_exists)
 
-        return (_fnl_files, _forecast_index)
\ No newline at end of file
+        return (_fnl_files, _forecast_index)
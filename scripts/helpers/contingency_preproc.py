@@ -1,147 +1,174 @@
 from ARI import *
-from contingency_config import * 
+from contingency_config import *
+from accumulate import anchor_start, consecutive_totals
+import wrf_daily
+from wrf_daily import daily_totals
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 
 _wrf_dir = Path(os.getenv("WRF_NC_DIR"))
-_gsmap_dir =  Path(os.getenv("GSMAP_NC_DIR"))
+_gsmap_dir = Path(os.getenv("GSMAP_NC_DIR"))
+
+# Number of times each input file was opened in this process. This is the
+# Counter of wrf_daily, so WRF reads through the daily product count as well.
+open_counts = wrf_daily.open_counts
+
+
+def _open_dataset(path):
+    open_counts[str(path)] += 1
+    return xr.open_dataset(path)
+
+
+def _open_mfdataset(paths, **kwargs):
+    for path in paths:
+        open_counts[str(path)] += 1
+    return xr.open_mfdataset(paths, **kwargs)
+
+
+def window_sum(path, start, var="rain"):
+    """Accumulation of var over the 24h starting at start (same bin as
+    resample(time="24H", base=<start hour>)), reading only that window."""
+    _start = pd.to_datetime(start)
+    _end = _start + pd.Timedelta(hours=24) - pd.Timedelta(1, "ns")
+    with _open_dataset(path) as _ds:
+        return _ds[var].sel(time=slice(_start, _end)).sum("time").load()
+
+
+def wrf_window_sum(path, start, var="rain"):
+    """window_sum of a WRF run, read from its daily product."""
+    return daily_totals(path, start, count=1).isel(time=0, drop=True)
+
+
+def lead_cube(paths, start, times, var="rain", read=window_sum):
+    """Stack the 24h window starting at start of every file in paths along a
+    new time dimension labelled with times.
+
+    Files are read (with read, e.g. window_sum) in parallel threads and copied
+    into one preallocated array.
+    """
+    with ThreadPoolExecutor(max_workers=len(paths)) as _pool:
+        _windows = [_pool.submit(read, path, start, var) for path in paths]
+        _first = _windows[0].result()
+        _cube = np.empty((len(paths),) + _first.shape, dtype=_first.dtype)
+        for idx, _window in enumerate(_windows):
+            _cube[idx] = _window.result().values
+
+    return (xr.DataArray(_cube, coords=_first.coords, dims=("time",) + _first.dims)
+            .assign_coords(time=times)
+            .to_dataset(name=var))
+
 
 class dataset_op:
-    """Class for pprec-processing forecast and observed ari to calculate their contingencies
-    using contingency_ari.py. Used in rain_extremes_verification.py
-    
+    """Class for pprec-processing forecast and observed ari to calculate their
+    contingencies using contingency_ari.py. Used in rain_extremes_verification.py
+
+    Each property is computed on first access and reused afterwards, so every
+    input file is opened once per instance (see open_counts).
+
     Returns
     -------
-    
+
     xr.Datarray of observed and forecasted ARI
-    
+
     Example usage
     --------------
     from contingency_preproc import dataset_op
     _datasets = dataset_op(forecast_days)
-    
+
     """
-    
+
     def __init__(
         self,
         forecast_days=None
     ):
-         if forecast_days is None:
-             self._forecast_days =  1
-         else:
-             self._forecast_days = forecast_days
-             
-         self._forecast, self._observed = self._get_forecast_obs()
-         self._ari_forecast, self._ari_observed = self._get_ari()
-    
-    @property
+        if forecast_days is None:
+            self._forecast_days = 1
+        else:
+            self._forecast_days = forecast_days
+        self._config = config_op()
+
+    @cached_property
     def forecast(self):
-        return self._forecast
-    
-    @property
+        _forecast_date_str = self._config.forecast_date_str
+
+        # daily totals of the first forecast days from the daily WRF product
+        # (days start at the initialization hour)
+        _start = pd.to_datetime(_forecast_date_str, format="%Y-%m-%d_%H")
+        _wrf_rain = daily_totals(_wrf_dir / f"wrf_{_forecast_date_str}.nc", _start,
+                                 count=self._forecast_days)
+
+        return _wrf_rain.to_dataset()
+
+    @cached_property
     def observed(self):
-        return self._observed
-    
-    @property
-    def ari_forecast(self):
-        return self._ari_forecast
-    
-    @property
-    def ari_observed(self):
-        return self._ari_observed
-    
-    
-    def _get_forecast_obs(self):
-        _config = config_op()
-        _forecast_day = _config.forecast_day
-        _forecast_hour = _config.forecast_hour
-        _forecast_date_str = _config.forecast_date_str
-        
-        _wrf_ds = (xr.open_dataset(_wrf_dir / f"wrf_{_forecast_date_str}.nc")[["rain"]]
-                .resample(time="24H", base=int(_forecast_hour))
-                .sum("time")
-                .isel(time=slice(self._forecast_days)))
-        
-        _dates = _wrf_ds.time.dt.strftime("%Y-%m-%d_%H").values
+        _forecast_hour = self._config.forecast_hour
+
+        _dates = self.forecast.time.dt.strftime("%Y-%m-%d_%H").values
         _gsmap_files = [_gsmap_dir / f"gsmap_gauge_{date}.nc" for date in _dates]
-        
-        _gsmap_ds = (xr.open_mfdataset(_gsmap_files, concat_dim="time", combine="nested"))
-        _gsmap_ds = _gsmap_ds.load().resample(time="24H", base=int(_forecast_hour)).sum("time")
+
+        _gsmap_ds = (_open_mfdataset(_gsmap_files, concat_dim="time", combine="nested"))
+        _gsmap_rain = _gsmap_ds["precip"].load()
+        _start = anchor_start(_gsmap_rain, int(_forecast_hour), utc_offset=0)
+        _gsmap_ds = consecutive_totals(_gsmap_rain, _start).to_dataset()
         _gsmap_ds = _gsmap_ds.isel(time=slice(self._forecast_days))
-        
-        return (_wrf_ds, _gsmap_ds)
-    
-    def _get_ari(self):
-        
-        _wrf_ds, _gsmap_ds = self._get_forecast_obs()
-        _ari_wrf = wrf_ari(_wrf_ds)
-        _ari_gsmap = gsmap_ari(_gsmap_ds)
-        
-        return (_ari_wrf, _ari_gsmap)
+
+        return _gsmap_ds
+
+    @cached_property
+    def ari_forecast(self):
+        return wrf_ari(self.forecast)
+
+    @cached_property
+    def ari_observed(self):
+        return gsmap_ari(self.observed)
+
 
 class dataset_lead:
+    """Lead time counterpart of dataset_op. Used in rain_extreme_verification_lead.py
+
+    Properties are lazy and memoized like in dataset_op. The forecast is one
+    cube with an entry along time per available init file (lead time), and the
+    verifying observation is read and converted to ARI only once.
+
+    """
+
     def __init__(
         self,
     ):
-         self._forecast, self._observed = self._get_forecast_obs()
-         self._ari_forecast, self._ari_observed = self._get_ari()
-    
-    @property
+        self._config = config_lead()
+
+    @cached_property
+    def lead_times(self):
+        _forecast_dates = self._config.forecast_dates[self._config.forecast_index]
+        return pd.to_datetime(_forecast_dates, format="%Y-%m-%d_%H")
+
+    @cached_property
     def forecast(self):
-        return self._forecast
-    
-    @property
+        return lead_cube(self._config.fnl_files, self._config.forecast_date_str,
+                         self.lead_times, "rain", read=wrf_window_sum)
+
+    @cached_property
+    def observed_day(self):
+        """Verifying GSMaP 24h rain, read once for all lead times"""
+        _forecast_dates = self._config.forecast_dates
+        _gsmap_file = _gsmap_dir / f"gsmap_gauge_{_forecast_dates[-1]}.nc"
+        _window = window_sum(_gsmap_file, self._config.forecast_date_str, "precip")
+        return _window.to_dataset()
+
+    @cached_property
     def observed(self):
-        return self._observed
-    
-    @property
+        # same observation for every lead time, broadcast without copying
+        return self.observed_day.expand_dims(time=self.lead_times)
+
+    @cached_property
     def ari_forecast(self):
-        return self._ari_forecast
-    
-    @property
+        return wrf_ari(self.forecast)
+
+    @cached_property
     def ari_observed(self):
-        return self._ari_observed
-    
-    
-    def _get_forecast_obs(self):
-        _config = config_lead()
-        _forecast_day = _config.forecast_day
-        _forecast_hour = _config.forecast_hour
-        _forecast_date_str = _config.forecast_date_str
-        _forecast_dates = _config.forecast_dates
-        _fnl_files = _config.fnl_files
-        _forecast_index = _config.forecast_index
-        
-        _gsmap_ds, _wrf_ds = [], []
-        for idx,file in zip(_forecast_index, _fnl_files):
-            wrf = (xr.open_dataset(file)[["rain"]]
-                .resample(time="24H", base=int(_forecast_hour))
-                .sum("time")
-                .sel(time=_forecast_date_str)
-                    )
-            wrf = (wrf
-                    .assign(time=pd.to_datetime(_forecast_dates[idx], format="%Y-%m-%d_%H"))
-                    .expand_dims("time"))
-            
-            gsmap = (xr.open_dataset(_gsmap_dir / f"gsmap_gauge_{_forecast_dates[-1]}.nc")
-                    .resample(time="24H", base=int(_forecast_hour))
-                    .sum("time")
-                    .isel(time=0))
-            gsmap = (gsmap
-                    .assign(time=pd.to_datetime(_forecast_dates[idx], format="%Y-%m-%d_%H"))
-                    .expand_dims("time"))
-            
-            _gsmap_ds.append(gsmap)
-            _wrf_ds.append(wrf)
-        
-        _wrf_ds = xr.concat(_wrf_ds, dim="time")
-        _gsmap_ds = xr.concat(_gsmap_ds, dim="time")
-        
-        return (_wrf_ds, _gsmap_ds)
-    
-    def _get_ari(self):
-        
-        _wrf_ds, _gsmap_ds = self._get_forecast_obs()
-        _ari_wrf = wrf_ari(_wrf_ds)
-        _ari_gsmap = gsmap_ari(_gsmap_ds)
-        
-        return (_ari_wrf, _ari_gsmap)
+        # ARI of the single verifying day, broadcast over the lead times
+        # (time stays the last dimension, as returned by ARIinterp)
+        _start = pd.to_datetime([self._config.forecast_date_str])
+        _ari = gsmap_ari(self.observed_day.expand_dims(time=_start))
+        return _ari.isel(time=0, drop=True).expand_dims(time=self.lead_times, axis=-1)
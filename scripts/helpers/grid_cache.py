@@ -0,0 +1,74 @@
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+import xesmf as xe
+
+weights_dir = Path(
+    os.getenv(
+        "REGRID_WEIGHTS_DIR", Path.home() / ".cache" / "validation" / "regrid_weights"
+    )
+)
+
+_grid_vars = ("lon", "lat", "longitude", "latitude", "lon_b", "lat_b")
+_regridders = {}
+
+
+def grid_hash(ds):
+    """Hash of the horizontal grid definition (coordinates and bounds) of ds.
+
+    Raises ValueError if ds has none of the grid variables, as every such grid
+    would otherwise share one hash (and one weight file).
+    """
+    _hash = hashlib.sha1()
+    _vars = ds.variables if isinstance(ds, xr.Dataset) else ds.coords
+    _names = [name for name in _grid_vars if name in _vars]
+    if not _names:
+        raise ValueError(
+            f"No grid coordinates ({', '.join(_grid_vars)}) to hash in {list(_vars)}"
+        )
+    for name in _names:
+        _vals = np.ascontiguousarray(ds[name].values, dtype=np.float64)
+        _hash.update(f"{name}{_vals.shape}".encode())
+        _hash.update(_vals.tobytes())
+    return _hash.hexdigest()
+
+
+def get_regridder(ds_in, ds_out, method="bilinear", **kwargs):
+    """xe.Regridder whose weights are stored on disk and reused across runs.
+
+    Weights are keyed by the hash of both grid definitions, the method and any
+    extra Regridder options, so they are only regenerated when a grid changes.
+    Regridders are also kept in memory for repeated calls within a process.
+    """
+    _opts = "".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+    _key = hashlib.sha1(
+        f"{grid_hash(ds_in)}{grid_hash(ds_out)}{method}{_opts}".encode()
+    ).hexdigest()
+
+    if _key in _regridders:
+        return _regridders[_key]
+
+    _weights_file = weights_dir / f"{method}_{_key}.nc"
+    if _weights_file.is_file():
+        _regridder = xe.Regridder(
+            ds_in,
+            ds_out,
+            method,
+            filename=str(_weights_file),
+            reuse_weights=True,
+            **kwargs,
+        )
+    else:
+        _regridder = xe.Regridder(ds_in, ds_out, method, **kwargs)
+        weights_dir.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first so concurrent runs never read
+        # a partially written weight file
+        _tmp_file = _weights_file.with_suffix(f".{os.getpid()}.tmp")
+        _regridder.to_netcdf(str(_tmp_file))
+        os.replace(_tmp_file, _weights_file)
+
+    _regridders[_key] = _regridder
+    return _regridder
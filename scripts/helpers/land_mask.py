@@ -0,0 +1,91 @@
+import os
+import sys
+import getopt
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import xarray as xr
+import salem
+
+from grid_cache import grid_hash
+from reference_data import script_dir, trmm_grid, trmm_ref_grid
+
+shp_file = script_dir / "shp/PHL_adm0/PHL_adm0.shp"
+masks_dir = Path(
+    os.getenv("LAND_MASK_DIR", Path.home() / ".cache" / "validation" / "land_masks")
+)
+
+_masks = {}
+
+
+def _rasterize(ds):
+    _shape = salem.read_shapefile(shp_file)
+    return ds.salem.grid.region_of_interest(shape=_shape).astype(bool)
+
+
+def land_mask(ds):
+    """Boolean Philippine land mask on the horizontal grid of ds.
+
+    The polygon is rasterized once per grid and shapefile version and stored
+    bit-packed under LAND_MASK_DIR; later calls only unpack the stored bits.
+    """
+    _key = hashlib.sha1(
+        f"{grid_hash(ds)}{shp_file.stat().st_mtime_ns}".encode()
+    ).hexdigest()
+
+    if _key not in _masks:
+        _mask_file = masks_dir / f"phl_mask_{_key}.npz"
+        if _mask_file.is_file():
+            with np.load(_mask_file) as _npz:
+                _shape = tuple(_npz["shape"])
+                _mask = np.unpackbits(_npz["bits"], count=np.prod(_shape))
+                _mask = _mask.reshape(_shape).astype(bool)
+        else:
+            _mask = _rasterize(ds)
+            masks_dir.mkdir(parents=True, exist_ok=True)
+            _tmp_file = masks_dir / f"phl_mask_{_key}.{os.getpid()}.npz"
+            np.savez(_tmp_file, bits=np.packbits(_mask), shape=_mask.shape)
+            os.replace(_tmp_file, _mask_file)
+
+        _y_dim, _x_dim = ds.salem.y_dim, ds.salem.x_dim
+        _masks[_key] = xr.DataArray(
+            _mask,
+            coords={_y_dim: ds[_y_dim].values, _x_dim: ds[_x_dim].values},
+            dims=(_y_dim, _x_dim),
+        )
+
+    return _masks[_key]
+
+
+def apply_land_mask(ds):
+    """Same as ds.salem.roi(shape=PHL_adm0) using the cached mask."""
+    return ds.where(land_mask(ds))
+
+
+if __name__ == "__main__":
+    in_files = []
+    trmm = False
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hi:t", ["ifile=", "trmm"])
+    except getopt.GetoptError:
+        print("land_mask.py [-i <grid nc file> ...] [-t]")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == "-h":
+            print("land_mask.py [-i <grid nc file> ...] [-t]")
+            print("  -i  prebuild the mask for the grid of a GSMaP/WRF/... file")
+            print("  -t  prebuild the masks for the TRMM verification grids")
+            sys.exit()
+        elif opt in ("-i", "--ifile"):
+            in_files.append(Path(arg))
+        elif opt in ("-t", "--trmm"):
+            trmm = True
+
+    grids = [salem.open_xr_dataset(in_file) for in_file in in_files]
+    if trmm:
+        grids += [trmm_grid(), trmm_ref_grid()]
+
+    for grid in grids:
+        _mask = land_mask(grid)
+        print(f"Land mask {grid_hash(grid)[:8]}: {int(_mask.sum())}/{_mask.size} cells")
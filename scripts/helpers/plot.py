@@ -1,10 +1,21 @@
+import os
 import pytz
+from pathlib import Path
 
+import cartopy
 from cartopy import crs as ccrs
 from cartopy.mpl.ticker import LongitudeFormatter, LatitudeFormatter
 
 import matplotlib.pyplot as plt
 
+# Natural Earth shapefiles (coastlines) are read from this local store, filled
+# once with `python plot.py`; drawing a map never downloads anything
+cartopy.config["pre_existing_data_dir"] = os.getenv(
+    "CARTOPY_DATA_DIR", cartopy.config["pre_existing_data_dir"]
+)
+# scales ax.coastlines() may pick
+COASTLINE_RESOLUTIONS = ("110m", "50m", "10m")
+
 tz = pytz.timezone("Asia/Manila")
 plot_proj = ccrs.PlateCarree()
 
@@ -15,47 +26,157 @@ lon_labels = range(120, 130, 5)
 lat_labels = range(5, 25, 5)
 XLIM = (116, 128)
 YLIM = (5, 20)
+# Fixed map and colorbar positions (figure fractions) instead of constrained
+# layout, so a map drawn on the MapTemplate matches one drawn on a new figure
+MAP_RECT = (0.07, 0.04, 0.78, 0.83)
+CBAR_RECT = (0.88, 0.25, 0.025, 0.41)
+
+_template = None
+
+
+def coastline_file(resolution):
+    """Path of the coastline shapefile of resolution in the local store."""
+    return (
+        Path(cartopy.config["pre_existing_data_dir"])
+        / "shapefiles"
+        / "natural_earth"
+        / "physical"
+        / f"ne_{resolution}_coastline.shp"
+    )
+
 
+def check_coastlines():
+    """Raise FileNotFoundError if the local store lacks coastlines, instead of
+    letting cartopy download them in the middle of drawing a map."""
+    _missing = [
+        res for res in COASTLINE_RESOLUTIONS if not coastline_file(res).is_file()
+    ]
+    if _missing:
+        raise FileNotFoundError(
+            f"Coastlines {', '.join(_missing)} missing from the Natural Earth "
+            f"store {cartopy.config['pre_existing_data_dir']} (CARTOPY_DATA_DIR); "
+            "fill it with `python plot.py` in scripts/helpers"
+        )
 
-def plot_map(da, plt_opts):
-    levels = plt_opts["levels"]
-    colors = plt_opts["colors"]
 
-    fig = plt.figure(figsize=(8, 9), constrained_layout=True)
-    ax = plt.axes(projection=plot_proj)
+def basemap():
+    """Figure and GeoAxes with everything but the data: ticks, coastlines,
+    extent and branding."""
+    check_coastlines()
+    fig = plt.figure(figsize=(8, 9))
+    ax = fig.add_axes(MAP_RECT, projection=plot_proj)
     ax.xaxis.set_major_formatter(lon_formatter)
     ax.yaxis.set_major_formatter(lat_formatter)
     ax.set_xticks(lon_labels, crs=plot_proj)
     ax.set_yticks(lat_labels, crs=plot_proj)
 
-    plt_title = plt_opts["title"]
-    fig.suptitle(plt_title, fontsize=14)
+    # cartopy's default zorder keeps the coastlines above the data layer
+    ax.coastlines()
+    ax.set_extent((*XLIM, *YLIM))
+
+    ax.annotate(
+        "observatory.ph",
+        xy=(10, 10),
+        xycoords="axes points",
+        fontsize=10,
+        bbox=dict(boxstyle="square,pad=0.3", alpha=0.5),
+        alpha=0.5,
+    )
+
+    return fig, ax
+
+
+def _draw_layer(fig, ax, da, plt_opts):
+    """Draw title, data, colorbar and annotation of one product on a basemap.
+    Returns the added artists."""
+    fig.suptitle(plt_opts["title"], fontsize=14)
 
+    cax = fig.add_axes(CBAR_RECT)
     p = da.plot(
         ax=ax,
         transform=plot_proj,
-        levels=levels,
-        colors=colors,
+        levels=plt_opts["levels"],
+        colors=plt_opts["colors"],
         add_labels=False,
         extend="both",
-        cbar_kwargs=dict(shrink=0.5),
+        cbar_ax=cax,
     )
 
     p.colorbar.ax.set_title(f"[{plt_opts['units']}]", pad=20, fontsize=10)
-    ax.coastlines()
+    # plotting rescales the axes to the data
     ax.set_extent((*XLIM, *YLIM))
 
+    layers = [p.colorbar, p]
     if "annotation" in plt_opts:
         plt_annotation = plt_opts["annotation"]
-        ax.annotate(plt_annotation, xy=(5, -30), xycoords="axes points", fontsize=8)
+        layers.append(
+            ax.annotate(plt_annotation, xy=(5, -30), xycoords="axes points", fontsize=8)
+        )
 
-    ax.annotate(
-        "observatory.ph",
-        xy=(10, 10),
-        xycoords="axes points",
-        fontsize=10,
-        bbox=dict(boxstyle="square,pad=0.3", alpha=0.5),
-        alpha=0.5,
-    )
+    return layers
+
+
+class MapTemplate:
+    """Basemap built once; plot() only swaps the title, data layer, colorbar
+    and annotation, so every map costs little more than drawing the data."""
+
+    def __init__(self):
+        self.fig, self.ax = basemap()
+        self._layers = []
+
+    def clear(self):
+        # removing the colorbar also removes its axes
+        for layer in self._layers:
+            layer.remove()
+        self._layers = []
+        self.ax.set_position(MAP_RECT)
 
+    def plot(self, da, plt_opts):
+        self.clear()
+        self._layers = _draw_layer(self.fig, self.ax, da, plt_opts)
+        return self.fig
+
+
+def map_template():
+    """MapTemplate shared by all maps of this process."""
+    global _template
+    if _template is None or not plt.fignum_exists(_template.fig.number):
+        _template = MapTemplate()
+    return _template
+
+
+def reset_template():
+    """Discard the shared MapTemplate (e.g. after a failed plot)."""
+    global _template
+    if _template is not None:
+        plt.close(_template.fig)
+    _template = None
+
+
+def plot_map(da, plt_opts, template=False):
+    """Map of da with the title, levels, colors, units and optional annotation
+    of plt_opts.
+
+    With template=True the figure is the process-wide MapTemplate, which must
+    not be closed by the caller; otherwise a new figure is built.
+    """
+    if template:
+        return map_template().plot(da, plt_opts)
+
+    fig, ax = basemap()
+    _draw_layer(fig, ax, da, plt_opts)
     return fig
+
+
+if __name__ == "__main__":
+    # Fill the local Natural Earth store (CARTOPY_DATA_DIR) with the coastlines
+    # of every scale ax.coastlines() may pick
+    from cartopy.io import shapereader
+
+    cartopy.config["data_dir"] = cartopy.config["pre_existing_data_dir"]
+    for resolution in COASTLINE_RESOLUTIONS:
+        shp_file = shapereader.natural_earth(
+            resolution=resolution, category="physical", name="coastline"
+        )
+        print(f"Coastlines {resolution}: {shp_file}")
+    check_coastlines()
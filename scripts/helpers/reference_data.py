@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+import xarray as xr
+
+script_dir = Path(f"{os.getenv('SCRIPT_DIR')}/python/resources")
+
+# TRMM subdomain used as the common verification grid
+TRMM_LON = slice(117.375, 126.375)
+TRMM_LAT = slice(5.125, 18.875)
+
+_cache = {}
+
+
+def _read_only(ds):
+    for _var in ds.variables.values():
+        _var.values.flags.writeable = False
+    return ds
+
+
+def _cached(name, path, builder):
+    """Build (and cache) a reference dataset once per process.
+
+    The cached object is rebuilt when the file's modification time changes.
+    """
+    _mtime = path.stat().st_mtime_ns
+    if name not in _cache or _cache[name][0] != _mtime:
+        with xr.open_dataset(path) as _ds:
+            _cache[name] = (_mtime, _read_only(builder(_ds).load()))
+    return _cache[name][1]
+
+
+def trmm_grid():
+    """TRMM target grid with longitude/latitude dims (used by the ARI regrid)."""
+    return _cached(
+        "trmm_grid",
+        script_dir / "nc/trmm_domain_regrid.nc",
+        lambda ds: (
+            ds.rename({"precipitation": "rain", "lon": "longitude", "lat": "latitude"})
+            .sel(longitude=TRMM_LON, latitude=TRMM_LAT)
+            .drop(("time_bnds", "time", "rain"))
+        ),
+    )
+
+
+def trmm_ref_grid():
+    """TRMM target grid with lon/lat dims (used by Contingency_clim)."""
+    return _cached(
+        "trmm_ref_grid",
+        script_dir / "nc/trmm_domain_regrid.nc",
+        lambda ds: (
+            ds.sel(lon=TRMM_LON, lat=TRMM_LAT).drop(
+                ("time_bnds", "time", "precipitation")
+            )
+        ),
+    )
+
+
+def phil_ari():
+    """Per-gridcell return levels of PHIL_ARI.nc, with precip renamed to rain."""
+    return _cached(
+        "phil_ari",
+        script_dir / "nc/PHIL_ARI.nc",
+        lambda ds: ds.rename({"precip": "rain"}),
+    )
+
+
+def trmm_clim():
+    """TRMM 1998-2015 monthly climatology."""
+    return _cached(
+        "trmm_clim", script_dir / "nc/trmm_1998-2015_clim.nc", lambda ds: ds
+    )
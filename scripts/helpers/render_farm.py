@@ -0,0 +1,96 @@
+import os
+import time
+import atexit
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib.pyplot as plt
+
+from helpers.plot import check_coastlines, map_template, plot_map, reset_template
+
+# out_file, rendering time in seconds, and the traceback if the job failed
+RenderResult = namedtuple("RenderResult", ["out_file", "seconds", "error"])
+
+_pools = {}
+
+
+def _warm_up():
+    """Pool initializer: build and draw the basemap template once so every
+    worker has its fonts, coastlines and projection ready before its first
+    job."""
+    template = map_template()
+    template.fig.canvas.draw()
+    # the first job starts from the same layout as the ones after it
+    template.clear()
+
+
+def render_map(da, plt_opts, out_file):
+    """Render da on the basemap template of this process and save it."""
+    _start = time.perf_counter()
+    try:
+        fig = plot_map(da, plt_opts, template=True)
+        fig.savefig(out_file, bbox_inches="tight", dpi=300)
+        _error = None
+    except Exception:
+        _error = traceback.format_exc()
+        # start the next map from a clean basemap
+        reset_template()
+        plt.close("all")
+    return RenderResult(out_file, time.perf_counter() - _start, _error)
+
+
+def _pool(workers):
+    # kept for the life of the process so later batches find warm workers
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(
+            max_workers=workers, initializer=_warm_up
+        )
+    return _pools[workers]
+
+
+@atexit.register
+def _shutdown():
+    for _executor in _pools.values():
+        _executor.shutdown()
+
+
+def render_maps(jobs, workers=None):
+    """Render a batch of (da, plt_opts, out_file) jobs across worker processes.
+
+    workers defaults to RENDER_WORKERS (or 4, as several map scripts may run
+    at once and each worker holds a full basemap); with one worker (or one
+    job) the maps are rendered in this process. Returns a RenderResult per
+    job, in job order. A failed job does not stop the others, but RuntimeError
+    is raised after the batch if any job failed, so the calling script exits
+    with an error.
+    """
+    jobs = list(jobs)
+    # fail once with a clear message rather than in every worker
+    check_coastlines()
+    if workers is None:
+        workers = int(os.getenv("RENDER_WORKERS", 4))
+    workers = min(workers, len(jobs))
+
+    if workers <= 1:
+        results = [render_map(*job) for job in jobs]
+    else:
+        _futures = [_pool(workers).submit(render_map, *job) for job in jobs]
+        results = []
+        for _job, _future in zip(jobs, _futures):
+            try:
+                results.append(_future.result())
+            except Exception:
+                # the worker itself died (e.g. out of memory)
+                results.append(RenderResult(_job[2], None, traceback.format_exc()))
+
+    for _result in results:
+        if _result.error is None:
+            print(f"Saved figure {_result.out_file} ({_result.seconds:.1f} s)")
+        else:
+            print(f"Failed figure {_result.out_file}\n{_result.error}")
+
+    _failed = [str(_result.out_file) for _result in results if _result.error]
+    if _failed:
+        raise RuntimeError(f"{len(_failed)} of {len(results)} maps failed: {_failed}")
+    return results
@@ -0,0 +1,48 @@
+import numpy as np
+
+SCORES = ["BIAS", "POD", "FAR", "SR", "CSI", "PCR", "ETS", "HSS"]
+
+
+def _ratio(num, den):
+    # zero denominators give NaN for every score
+    num, den = np.broadcast_arrays(
+        np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64)
+    )
+    return np.divide(num, den, out=np.full(num.shape, np.nan), where=den != 0)
+
+
+def skill_scores(hits, false_alarms, misses, correct_negatives):
+    """Contingency skill scores of N-dimensional count arrays.
+
+    The four count arrays broadcast against each other, so any mix of time,
+    lead, category or threshold axes is scored in one call. A score is NaN
+    wherever its denominator is zero.
+
+    Returns a dict of float64 arrays keyed by SCORES.
+    """
+    _h = np.asarray(hits, dtype=np.float64)
+    _f = np.asarray(false_alarms, dtype=np.float64)
+    _m = np.asarray(misses, dtype=np.float64)
+    _cn = np.asarray(correct_negatives, dtype=np.float64)
+
+    _total = _h + _f + _m + _cn
+    _hits_random = _ratio((_h + _m) * (_h + _f), _total)
+
+    return {
+        "BIAS": _ratio(_h + _f, _h + _m),
+        "POD": _ratio(_h, _h + _m),
+        "FAR": _ratio(_f, _h + _f),
+        "SR": _ratio(_h, _h + _f),
+        "CSI": _ratio(_h, _h + _f + _m),
+        "PCR": _ratio(_cn, _f + _cn),
+        "ETS": _ratio(_h - _hits_random, _h + _f + _m - _hits_random),
+        "HSS": _ratio(
+            2 * (_h * _cn - _f * _m), (_h + _m) * (_m + _cn) + (_h + _f) * (_f + _cn)
+        ),
+    }
+
+
+def skill_scores_stacked(counts):
+    """skill_scores of counts stacked along the last axis as
+    (hits, false alarms, misses, correct negatives)."""
+    return skill_scores(*np.moveaxis(np.asarray(counts), -1, 0))
@@ -0,0 +1,37 @@
+from station_index import station_index
+
+
+def extract_points(ds, stn_file, method="nearest", time=None):
+    """Values of ds at every station of stn_file at once, along a new station
+    dimension.
+
+    Gridpoints and weights come from the cached station index of the grid, so
+    "nearest" (the gridpoint .sel(method="nearest") picks) and "bilinear" are
+    integer gathers. time (a slice or index array) limits the time steps read
+    from ds.
+    """
+    if time is not None:
+        ds = ds.isel(time=time)
+
+    index = station_index(ds, stn_file)
+    if method == "nearest":
+        return index.nearest(ds)
+    elif method == "bilinear":
+        return index.bilinear(ds)
+    raise ValueError(f"Unknown method {method!r}")
+
+
+def write_stations_csv(points, var_name, out_file):
+    """One CSV for all stations: time along rows, a column per station."""
+    df = points[var_name].transpose("time", "station").to_pandas()
+    df.to_csv(out_file)
+    return out_file
+
+
+def write_legacy_csvs(points, var_name, out_dir, file_fmt):
+    """Per-station CSVs (values only, no header or index) as written by the
+    original extract scripts. file_fmt is formatted with the station name."""
+    df = points[var_name].transpose("time", "station").to_pandas()
+    for name in df.columns:
+        out_file = out_dir / file_fmt.format(name=name)
+        df[name].to_csv(out_file, index=False, header=False)
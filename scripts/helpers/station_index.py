@@ -0,0 +1,205 @@
+import os
+import sys
+import getopt
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+from scipy.spatial import cKDTree
+
+from grid_cache import grid_hash
+
+index_dir = Path(
+    os.getenv(
+        "STATION_INDEX_DIR", Path.home() / ".cache" / "validation" / "station_index"
+    )
+)
+
+_stations = {}
+_indexes = {}
+
+
+def read_stations(stn_file):
+    """Station table (name, lat, lon, ...) read once per process.
+
+    Stray whitespace (e.g. tabs) around every field is removed.
+    """
+    stn_file = Path(stn_file)
+    _mtime = stn_file.stat().st_mtime_ns
+    _key = str(stn_file.resolve())
+    if _key not in _stations or _stations[_key][0] != _mtime:
+        stn_df = pd.read_csv(stn_file, dtype=str)
+        stn_df.columns = stn_df.columns.str.strip()
+        stn_df = stn_df.apply(lambda col: col.str.strip())
+        stn_df[["lat", "lon"]] = stn_df[["lat", "lon"]].astype(float)
+        _stations[_key] = (_mtime, stn_df)
+    return _stations[_key][1]
+
+
+def stations_hash(stn_df):
+    """Hash of the station names and positions."""
+    _table = stn_df[["name", "lat", "lon"]].to_csv(index=False)
+    return hashlib.sha1(_table.encode()).hexdigest()
+
+
+def _grid_dims(ds):
+    if "lat" in ds.coords:
+        return "lat", "lon"
+    return "latitude", "longitude"
+
+
+def _bracket(coord, values):
+    """Lower neighbour index and linear weight of the upper neighbour of each
+    value on a monotonic 1-D coordinate."""
+    _desc = coord[0] > coord[-1]
+    _asc = coord[::-1] if _desc else coord
+    _i0 = np.clip(np.searchsorted(_asc, values) - 1, 0, len(_asc) - 2)
+    _w = (values - _asc[_i0]) / (_asc[_i0 + 1] - _asc[_i0])
+    if _desc:
+        return len(coord) - 2 - _i0, 1 - _w
+    return _i0, _w
+
+
+class StationIndex:
+    """Precomputed gridpoint indices of a set of stations on one grid.
+
+    Nearest gridpoints (iy, ix) and, for rectilinear grids, the lower corner
+    (y0, x0) and weights (wy, wx) of the bilinear stencil of every station,
+    so extracting station values is an integer gather.
+    """
+
+    _fields = ("iy", "ix", "y0", "x0", "wy", "wx")
+
+    def __init__(self, names, dims, iy, ix, y0=None, x0=None, wy=None, wx=None):
+        self.names = np.asarray(names, dtype=str)
+        self.dims = tuple(dims)
+        self.iy, self.ix = np.asarray(iy), np.asarray(ix)
+        self.y0, self.x0, self.wy, self.wx = y0, x0, wy, wx
+        self._pos = {name: pos for pos, name in enumerate(self.names)}
+
+    @classmethod
+    def build(cls, ds, stn_df):
+        _y, _x = _grid_dims(ds)
+        _lat, _lon = ds[_y].values, ds[_x].values
+        _slat, _slon = stn_df["lat"].values, stn_df["lon"].values
+        _names = stn_df["name"].values
+
+        if _lat.ndim == 1:
+            # per axis, exactly what .sel(method="nearest") selects
+            _iy = pd.Index(_lat).get_indexer(_slat, method="nearest")
+            _ix = pd.Index(_lon).get_indexer(_slon, method="nearest")
+            _y0, _wy = _bracket(_lat, _slat)
+            _x0, _wx = _bracket(_lon, _slon)
+            return cls(_names, (_y, _x), _iy, _ix, _y0, _x0, _wy, _wx)
+
+        # curvilinear grid: nearest gridpoint in lat/lon space
+        _tree = cKDTree(np.column_stack([_lat.ravel(), _lon.ravel()]))
+        _, _flat = _tree.query(np.column_stack([_slat, _slon]))
+        _iy, _ix = np.unravel_index(_flat, _lat.shape)
+        return cls(_names, ds[_y].dims, _iy, _ix)
+
+    def save(self, path):
+        _arrays = {k: getattr(self, k) for k in self._fields}
+        _arrays = {k: v for k, v in _arrays.items() if v is not None}
+        np.savez(path, names=self.names, dims=np.array(self.dims), **_arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as _npz:
+            _arrays = {k: _npz[k] for k in cls._fields if k in _npz.files}
+            return cls(_npz["names"], _npz["dims"].tolist(), **_arrays)
+
+    def positions(self, names=None):
+        if names is None:
+            return np.arange(len(self.names))
+        if np.ndim(names) == 0:
+            return self._pos[names]
+        return np.array([self._pos[name] for name in names])
+
+    def nearest(self, ds, names=None):
+        """Values of ds at the nearest gridpoint of the stations.
+
+        A single station name drops the station dimension, like .sel.
+        """
+        _pos = self.positions(names)
+        _iy, _ix = self.iy[_pos], self.ix[_pos]
+        if np.ndim(_pos) > 0:
+            _iy = xr.DataArray(_iy, dims="station")
+            _ix = xr.DataArray(_ix, dims="station")
+        _out = ds.isel({self.dims[0]: _iy, self.dims[1]: _ix})
+        if np.ndim(_pos) > 0:
+            _out = _out.assign_coords(station=self.names[_pos])
+        return _out
+
+    def bilinear(self, ds, names=None):
+        """Bilinear interpolation of ds to the stations (rectilinear grids)."""
+        if self.wy is None:
+            raise ValueError("Bilinear weights need a grid with 1-D lat/lon")
+        _pos = np.atleast_1d(self.positions(names))
+        _y0 = xr.DataArray(self.y0[_pos], dims="station")
+        _x0 = xr.DataArray(self.x0[_pos], dims="station")
+        _wy = xr.DataArray(self.wy[_pos], dims="station")
+        _wx = xr.DataArray(self.wx[_pos], dims="station")
+
+        _y, _x = self.dims
+        _out = 0
+        for _dy, _fy in ((0, 1 - _wy), (1, _wy)):
+            for _dx, _fx in ((0, 1 - _wx), (1, _wx)):
+                _corner = ds.isel({_y: _y0 + _dy, _x: _x0 + _dx}, drop=True)
+                _out = _out + _fy * _fx * _corner
+        _out = _out.assign_coords(station=self.names[_pos])
+        if np.ndim(names) == 0 and names is not None:
+            return _out.isel(station=0)
+        return _out
+
+
+def station_index(ds, stn_file):
+    """StationIndex of the stations in stn_file on the grid of ds.
+
+    Indexes are keyed by the grid and station hashes, kept in memory and
+    stored under STATION_INDEX_DIR, so they are only computed once per grid.
+    """
+    stn_df = read_stations(stn_file)
+    _key = hashlib.sha1(
+        f"{grid_hash(ds)}{stations_hash(stn_df)}".encode()
+    ).hexdigest()
+
+    if _key not in _indexes:
+        _index_file = index_dir / f"stations_{_key}.npz"
+        if _index_file.is_file():
+            _index = StationIndex.load(_index_file)
+        else:
+            _index = StationIndex.build(ds, stn_df)
+            index_dir.mkdir(parents=True, exist_ok=True)
+            _tmp_file = index_dir / f"stations_{_key}.{os.getpid()}.npz"
+            _index.save(_tmp_file)
+            os.replace(_tmp_file, _index_file)
+        _indexes[_key] = _index
+
+    return _indexes[_key]
+
+
+if __name__ == "__main__":
+    in_files = []
+    stn_file = None
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hi:s:", ["ifile=", "stations="])
+    except getopt.GetoptError:
+        print("station_index.py -s <station csv> -i <grid nc file> ...")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == "-h":
+            print("station_index.py -s <station csv> -i <grid nc file> ...")
+            print("  prebuild the station index of every grid")
+            sys.exit()
+        elif opt in ("-i", "--ifile"):
+            in_files.append(Path(arg))
+        elif opt in ("-s", "--stations"):
+            stn_file = Path(arg)
+
+    for in_file in in_files:
+        with xr.open_dataset(in_file) as ds:
+            _index = station_index(ds, stn_file)
+        print(f"Station index {in_file.name}: {len(_index.names)} stations")
@@ -0,0 +1,217 @@
+"""Daily rain product of the hourly WRF runs.
+
+wrf_daily.py turns an hourly wrf_<init>.nc into wrf_daily_<init>_<dir>.nc
+under WRF_DAILY_DIR, holding 24-hr totals of every member (rain) and of the
+ensemble mean (rain_ensmean). Windows start at the initialization hour (08
+PHT for 00 UTC runs, 20 PHT for 12 UTC runs), so lead_day 0 is the first full
+day of the run, and only windows the run covers from start to end are kept.
+Windows at another start hour (e.g. 08 PHT of a 12 UTC run) are summed from
+the hourly file by daily_totals.
+"""
+
+import os
+import sys
+import getopt
+import hashlib
+from pathlib import Path
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from accumulate import naive_utc, consecutive_totals
+
+daily_dir = Path(
+    os.getenv("WRF_DAILY_DIR", Path.home() / ".cache" / "validation" / "wrf_daily")
+)
+
+_products = {}
+
+# Number of times each hourly file and product was opened in this process
+# (contingency_preproc counts its GSMaP opens in the same Counter)
+open_counts = Counter()
+
+
+def _open_dataset(path):
+    open_counts[str(path)] += 1
+    return xr.open_dataset(path)
+
+
+def daily_file(wrf_file):
+    """wrf_daily_<init>_<dir>.nc product of the hourly wrf_<init>.nc file.
+
+    <dir> is a hash of the directory of the hourly file, so runs of the same
+    initialization in different directories (WRF_NC_DIR, PYWRF_NC_DIR) get
+    products of their own.
+    """
+    wrf_file = Path(wrf_file).resolve()
+    _dir = hashlib.sha1(str(wrf_file.parent).encode()).hexdigest()[:8]
+    _name = wrf_file.stem.replace("wrf_", "wrf_daily_", 1)
+    return daily_dir / f"{_name}_{_dir}.nc"
+
+
+def _source_attrs(wrf_file):
+    """Identity of the hourly file a product is written from (as strings, which
+    every netCDF format stores exactly)."""
+    _stat = wrf_file.stat()
+    return {
+        "source": str(wrf_file),
+        "source_mtime_ns": str(_stat.st_mtime_ns),
+        "source_size": str(_stat.st_size),
+    }
+
+
+def init_time(wrf_file, rain):
+    """Initialization time of a WRF run, from its wrf_<YYYY-MM-DD_HH>.nc name
+    or else the first time step of rain."""
+    try:
+        return pd.to_datetime(Path(wrf_file).stem, format="wrf_%Y-%m-%d_%H")
+    except ValueError:
+        return pd.Timestamp(rain["time"].values[0])
+
+
+def full_windows(rain, starts, hours=24):
+    """Mask of the windows from starts that the time steps of rain cover from
+    start to end (up to a time step, whether steps are labelled by the start
+    or the end of their hour)."""
+    times = pd.DatetimeIndex(rain["time"].values)
+    step = times[1] - times[0] if len(times) > 1 else pd.Timedelta(hours=1)
+    starts = pd.DatetimeIndex(starts)
+    return (starts >= times[0] - step) & (
+        starts + pd.Timedelta(hours=hours) <= times[-1] + step
+    )
+
+
+def write_daily(wrf_file):
+    """Write the daily rain product of an hourly WRF file: 24-hr totals from
+    the initialization hour of every member (rain) and of the ensemble mean
+    (rain_ensmean), float32, compressed and chunked per day."""
+    wrf_file = Path(wrf_file).resolve()
+    with _open_dataset(wrf_file) as ds:
+        rain = ds["rain"].load()
+
+    _start = init_time(wrf_file, rain)
+    totals = consecutive_totals(rain, _start)
+    totals = totals.isel(time=full_windows(rain, totals["time"].values))
+    ds_out = xr.Dataset(
+        {
+            "rain": totals.astype("float32"),
+            "rain_ensmean": totals.mean("ens").astype("float32"),
+        }
+    )
+    ds_out = ds_out.assign_coords(lead_day=("time", np.arange(ds_out.sizes["time"])))
+    ds_out["rain"].attrs = rain.attrs
+    ds_out["rain_ensmean"].attrs = rain.attrs
+    ds_out.attrs.update(_source_attrs(wrf_file))
+    ds_out.attrs["window"] = (
+        f"full 24-hr totals from the initialization ({_start:%H} UTC)"
+    )
+
+    encoding = {
+        name: {
+            "zlib": True,
+            "complevel": 4,
+            "chunksizes": tuple(
+                1 if dim == "time" else size
+                for dim, size in zip(da.dims, da.shape)
+            ),
+        }
+        for name, da in ds_out.data_vars.items()
+    }
+
+    daily_dir.mkdir(parents=True, exist_ok=True)
+    out_file = daily_file(wrf_file)
+    tmp_file = out_file.with_suffix(f".{os.getpid()}.nc")
+    ds_out.to_netcdf(tmp_file, encoding=encoding)
+    os.replace(tmp_file, out_file)
+    return out_file
+
+
+def _read_daily(out_file):
+    key = (str(out_file), out_file.stat().st_mtime_ns)
+    if key not in _products:
+        with _open_dataset(out_file) as ds:
+            _products[key] = ds.load()
+    return _products[key]
+
+
+def open_daily(wrf_file):
+    """Daily rain product of wrf_file, read once per process.
+
+    The product is (re)written first when it is missing or was written from
+    another path, modification time or size of the hourly file. None if
+    neither exists.
+    """
+    wrf_file = Path(wrf_file).resolve()
+    out_file = daily_file(wrf_file)
+    ds = _read_daily(out_file) if out_file.is_file() else None
+    if wrf_file.is_file() and (
+        ds is None
+        or any(
+            ds.attrs.get(name) != value
+            for name, value in _source_attrs(wrf_file).items()
+        )
+    ):
+        write_daily(wrf_file)
+        ds = _read_daily(out_file)
+    return ds
+
+
+def daily_totals(wrf_file, start, count=None, ensmean=False):
+    """24-hr rain totals of consecutive days from start (at most count days),
+    labelled by window start along time.
+
+    Read from the daily product; windows that are not in it (another start
+    hour) are summed from the hourly file. None if there is no data.
+    """
+    var = "rain_ensmean" if ensmean else "rain"
+    start = np.datetime64(naive_utc(start), "ns")
+
+    ds = open_daily(wrf_file)
+    if ds is None:
+        return None
+    if start in ds["time"].values:
+        _first = int(np.flatnonzero(ds["time"].values == start)[0])
+        totals = ds[var].isel(time=slice(_first, None)).isel(time=slice(count))
+        return totals.drop_vars("lead_day")
+
+    # hourly fallback
+    if not Path(wrf_file).is_file():
+        return None
+    with _open_dataset(wrf_file) as hourly:
+        rain = hourly["rain"].load()
+    totals = consecutive_totals(rain, pd.Timestamp(start)).isel(time=slice(count))
+    if ensmean:
+        totals = totals.mean("ens")
+    return totals
+
+
+def daily_rain(wrf_file, start, ensmean=False):
+    """24-hr rain total of the day starting at start (see daily_totals)."""
+    totals = daily_totals(wrf_file, start, count=1, ensmean=ensmean)
+    if totals is None or totals.sizes["time"] == 0:
+        return None
+    return totals.isel(time=0, drop=True)
+
+
+if __name__ == "__main__":
+    in_files = []
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hi:", ["ifile="])
+    except getopt.GetoptError:
+        print("wrf_daily.py -i <hourly wrf nc file> ...")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt == "-h":
+            print("wrf_daily.py -i <hourly wrf nc file> ...")
+            print("  write the daily rain product of each WRF run")
+            sys.exit()
+        elif opt in ("-i", "--ifile"):
+            in_files.append(Path(arg))
+
+    for in_file in in_files:
+        if not in_file.is_file():
+            print(f"File {in_file} does not exist")
+            continue
+        print(f"Saved {write_daily(in_file)}")
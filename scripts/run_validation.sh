@@ -30,6 +30,26 @@ while [ -n "$1" ]; do
 done
 ###################################################
 
+# -------------------------------------------- #
+#              MAP COASTLINES                  #
+# -------------------------------------------- #
+
+# The map scripts only read coastlines from the local Natural Earth store
+# (CARTOPY_DATA_DIR); fill it once
+if [ $DOWNLOAD_INPUT -eq 1 ] && [ ! -f "$CARTOPY_DATA_DIR/shapefiles/natural_earth/physical/ne_10m_coastline.shp" ]; then
+  cd "$VAL_DIR/scripts/helpers" || exit
+  $PYTHON plot.py
+fi
+
+# -------------------------------------------- #
+#              WRF DAILY RAIN                  #
+# -------------------------------------------- #
+
+# Daily rain totals of the new WRF run, read by the verification scripts
+# instead of the hourly file
+cd "$VAL_DIR/scripts/helpers" || exit
+$PYTHON wrf_daily.py -i "$PYWRF_NC_DIR/wrf_${FCST_YY}-${FCST_MM}-${FCST_DD}_${FCST_ZZ}.nc"
+
 # -------------------------------------------- #
 #                 GSMaP                        #
 # -------------------------------------------- #
@@ -122,8 +142,15 @@ $PYTHON plot_ts.py -i "$VAL_OUTDIR" -o "$VAL_OUTDIR"
 
 # Edit time series plotting script
 
+# Store the station series of the new GSMaP file for the 5-day time series
+$PYTHON gsmap_station_series.py -d "${FCST_YY}-${FCST_MM}-${FCST_DD}"
+
 # Plot 5-day time series WRF, AWS, and GSMaP
-$PYTHON plot_stations_ts.py -o "$VAL_OUTDIR"
+$PYTHON plot_stations_ts.py -o "$VAL_OUTDIR" -w "${STATION_PLOT_WORKERS:-4}"
+
+# Fold the 5-day forecast errors of 3 days ago into the daily accumulators
+ACCUM_DATE=$(date -d "${FCST_YY}-${FCST_MM}-${FCST_DD} 3 days ago" +'%Y-%m-%d')
+$PYTHON error_accumulators.py -d "$ACCUM_DATE"
 
 # Plot statistical error metrics (month summary only, runs every 5th day of month)
 $PYTHON scalar_measures.py -o "$VAL_OUTDIR"
@@ -144,7 +171,7 @@ cd "$VAL_DIR/scripts/contingency" || exit
 $PYTHON forecast_verification.py -o "$VAL_OUTDIR"
 
 # only executes during Sundays
-$PYTHON forecast_verification_week_and_month_average.py
+$PYTHON forecast_verification_week_and_month_average.py -o "$VAL_OUTDIR"
 
 echo "---------------------------"
 echo " Done with contingency!    "
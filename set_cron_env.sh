@@ -7,6 +7,15 @@ export CITY_ID="NCR"
 export VAL_DIR=$MAINDIR/validation
 
 export TEMP_DIR=${VAL_DIR}/.tmp
+export REGRID_WEIGHTS_DIR=${VAL_DIR}/cache/regrid_weights
+export LAND_MASK_DIR=${VAL_DIR}/cache/land_masks
+export CONTINGENCY_COUNTS_DIR=${VAL_DIR}/cache/contingency_counts
+export STATION_INDEX_DIR=${VAL_DIR}/cache/station_index
+export GSMAP_STATION_DIR=${VAL_DIR}/cache/gsmap_stations
+export AWS_CACHE_DIR=${VAL_DIR}/cache/aws_obs
+export ERROR_ACCUM_DIR=${VAL_DIR}/cache/error_accumulators
+export CARTOPY_DATA_DIR=${VAL_DIR}/input/cartopy
+export WRF_DAILY_DIR=${VAL_DIR}/input/wrf_daily
 
 export VAL_GFS_NC_DIR=${VAL_DIR}/input/gfs
 export PYWRF_NC_DIR=${VAL_DIR}/input/wrf_out
@@ -21,5 +30,6 @@ export WRF_JSON_DIR=$MAINDIR/output/stations_fcst_for_validation/json
 
 export CONDA_PREFIX=${VAL_DIR}/venv
 export MPLBACKEND="agg"
+export RENDER_WORKERS=4
 export PYTHONPATH=${VAL_DIR}/scripts:$PYTHONPATH
 export PYTHON=${CONDA_PREFIX}/bin/python